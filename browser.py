@@ -0,0 +1,114 @@
+"""Chrome WebDriver construction shared by the automation and test tools"""
+
+import json
+import logging
+import os
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from browser_memory import track
+from config import PAGE_LOAD_STRATEGY, CHROME_PRESETS, PROFILE_TEMPLATE
+from profile_template import copy_template, remove_profile
+
+
+logger = logging.getLogger(__name__)
+
+PRESETS_FILE = "chrome_presets.json"
+
+
+def load_presets(path=PRESETS_FILE):
+    """Presets from config.py, plus or overridden by those saved in ``path``"""
+    presets = dict(CHROME_PRESETS)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            presets.update(json.load(f))
+    return presets
+
+
+def save_preset(name, preset, path=PRESETS_FILE):
+    """Add or replace one named preset in the presets file"""
+    saved = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    saved[name] = preset
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(saved, f, indent=2)
+
+
+def resolve_preset(preset):
+    """A preset dict from a name or a dict; None stays None"""
+    if preset is None or isinstance(preset, dict):
+        return preset
+    presets = load_presets()
+    if preset not in presets:
+        raise ValueError(f"Unknown Chrome preset '{preset}' (available: {', '.join(presets)})")
+    return presets[preset]
+
+
+def build_chrome_options(headless=True, detach=False, page_load_strategy=None, performance_log=False, proxy=None,
+                         preset=None):
+    """Build Chrome options for an automation or test session"""
+    chrome_options = Options()
+    preset = resolve_preset(preset)
+    if preset is None:
+        if headless:
+            chrome_options.add_argument("--headless")
+            chrome_options.add_argument("--no-sandbox")
+            chrome_options.add_argument("--disable-dev-shm-usage")
+    else:
+        if headless:
+            chrome_options.add_argument(f"--headless={preset.get('headless_mode', 'new')}")
+        for argument in preset.get("args", []):
+            chrome_options.add_argument(argument)
+        if preset.get("window_size"):
+            width, height = preset["window_size"]
+            chrome_options.add_argument(f"--window-size={width},{height}")
+        page_load_strategy = page_load_strategy or preset.get("page_load_strategy")
+    if detach:
+        chrome_options.add_experimental_option("detach", True)
+    chrome_options.page_load_strategy = page_load_strategy or PAGE_LOAD_STRATEGY
+    if performance_log:
+        # Performance log carries the CDP events used for readiness detection
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if proxy:
+        chrome_options.add_argument(f"--proxy-server={proxy}")
+        # Chrome bypasses the proxy for localhost unless told not to, which
+        # would skip the mock site
+        chrome_options.add_argument("--proxy-bypass-list=<-loopback>")
+    return chrome_options
+
+
+def create_driver(headless=True, detach=False, page_load_strategy=None, performance_log=False, proxy=None,
+                  preset=None, profile_template=None):
+    """Start a Chrome WebDriver session; it is reaped at exit unless quit first.
+
+    ``preset`` is a name from ``load_presets()`` or a preset dict. The
+    session starts from a copy of ``profile_template`` (default
+    ``PROFILE_TEMPLATE``) when that directory exists; pass False to start
+    from an empty profile. The copy is deleted when the driver quits.
+    """
+    chrome_options = build_chrome_options(headless, detach, page_load_strategy, performance_log, proxy, preset)
+    template = PROFILE_TEMPLATE if profile_template is None else profile_template
+    if not template or not os.path.isdir(template):
+        return track(webdriver.Chrome(options=chrome_options))
+
+    started = time.perf_counter()
+    profile = copy_template(template)
+    logger.info(f"📦 Copied profile template {template} in {time.perf_counter() - started:.2f}s")
+    chrome_options.add_argument(f"--user-data-dir={profile}")
+    try:
+        driver = track(webdriver.Chrome(options=chrome_options))
+    except Exception:
+        remove_profile(profile)
+        raise
+    quit_driver = driver.quit
+
+    def quit_and_remove_profile():
+        try:
+            quit_driver()
+        finally:
+            remove_profile(profile)
+
+    driver.quit = quit_and_remove_profile
+    return driver
@@ -0,0 +1,227 @@
+"""Chrome memory sampling, session recycling and orphan reaping.
+
+RSS per process comes from psutil when it is installed; otherwise the
+page's JS heap from CDP ``Performance.getMetrics`` is the only signal.
+Every driver made by ``browser.create_driver`` is tracked, and any that
+was not quit (crash, Ctrl-C, SIGTERM, detached browser) is closed and its
+process tree killed when the interpreter exits.
+"""
+
+import atexit
+import logging
+import signal
+import sys
+import argparse
+from config import CHROME_MEMORY_LIMIT_MB
+
+try:
+    import psutil
+except ImportError:  # Optional dependency
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Drivers not yet quit, with the pids of their process tree at start
+_tracked = {}
+_reaper_installed = False
+_sigterm_installed = False
+_signal_received = None
+
+
+def process_tree(driver):
+    """psutil processes of chromedriver and every Chrome process under it"""
+    if psutil is None:
+        return []
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    if process is None:
+        return []
+    try:
+        root = psutil.Process(process.pid)
+        return [root] + root.children(recursive=True)
+    except psutil.Error:
+        return []
+
+
+def sample_memory(driver):
+    """Current memory use of one session in MB.
+
+    Returns ``{"source": "psutil", "browser": ..., "renderer": ...,
+    "total": ...}`` or, without psutil, ``{"source": "cdp", "total": ...}``
+    holding the page's JS heap.
+    """
+    if psutil is not None:
+        browser = renderer = 0
+        for process in process_tree(driver):
+            try:
+                rss = process.memory_info().rss
+                command_line = " ".join(process.cmdline())
+            except psutil.Error:
+                continue
+            if "--type=renderer" in command_line:
+                renderer += rss
+            elif "chromedriver" not in process.name().lower():
+                browser += rss
+        return {"source": "psutil", "browser": browser / MB, "renderer": renderer / MB,
+                "total": (browser + renderer) / MB}
+
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    except Exception:
+        return None
+    values = {metric["name"]: metric["value"] for metric in metrics}
+    return {"source": "cdp", "total": values.get("JSHeapTotalSize", 0) / MB}
+
+
+class MemoryMonitor:
+    """Check a session against a memory cap between units of work"""
+
+    def __init__(self, limit_mb=None):
+        self.limit_mb = limit_mb or CHROME_MEMORY_LIMIT_MB
+        self.peak_mb = 0.0
+        self.recycles = 0
+
+    def over_limit(self, driver):
+        sample = sample_memory(driver)
+        if not sample:
+            return False
+        self.peak_mb = max(self.peak_mb, sample["total"])
+        return sample["total"] > self.limit_mb
+
+    def recycle_if_needed(self, driver, create):
+        """Return ``driver``, or a fresh one from ``create()`` if over the cap.
+
+        The new session starts on the page the old one was showing.
+        """
+        if not self.over_limit(driver):
+            return driver
+        try:
+            url = driver.current_url
+        except Exception:
+            url = None
+        logger.info(f"♻️ Browser over {self.limit_mb} MB, starting a fresh session")
+        driver.quit()
+        self.recycles += 1
+        driver = create()
+        if url and url.startswith("http"):
+            driver.get(url)
+        return driver
+
+
+def track(driver):
+    """Register a driver so it is reaped at exit unless quit first"""
+    install_reaper()
+    _tracked[id(driver)] = (driver, [process.pid for process in process_tree(driver)])
+    quit_driver = driver.quit
+
+    def tracked_quit():
+        _tracked.pop(id(driver), None)
+        quit_driver()
+
+    driver.quit = tracked_quit
+    return driver
+
+
+def reap():
+    """Quit every tracked driver and kill whatever is left of its processes"""
+    for driver, pids in list(_tracked.values()):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        if psutil is None:
+            continue
+        for pid in pids:
+            try:
+                psutil.Process(pid).kill()
+            except psutil.Error:
+                pass
+    _tracked.clear()
+
+
+def install_reaper(sigterm=False):
+    """Reap at interpreter exit, and on SIGTERM if ``sigterm`` is set.
+
+    ``track`` registers the exit hook itself. Entry points pass
+    ``sigterm=True`` from their main thread, the only place a signal handler
+    can be set; the handler raises SystemExit so ``finally`` blocks and the
+    exit hook still run.
+    """
+    global _reaper_installed, _sigterm_installed
+    if not _reaper_installed:
+        _reaper_installed = True
+        atexit.register(reap)
+    if sigterm and not _sigterm_installed:
+        _sigterm_installed = True
+        signal.signal(signal.SIGTERM, _exit_on_signal)
+
+
+def _exit_on_signal(signum, frame):
+    global _signal_received
+    _signal_received = signum
+    sys.exit(128 + signum)
+
+
+def exiting_on_signal():
+    """True once SIGTERM has started shutting the process down"""
+    return _signal_received is not None
+
+
+def find_orphans():
+    """Automation Chrome processes whose driver process is gone"""
+    if psutil is None:
+        return []
+    orphans = []
+    for process in psutil.process_iter(["name", "cmdline", "ppid"]):
+        command_line = " ".join(process.info["cmdline"] or [])
+        # Browser processes launched by chromedriver, not their helpers
+        if "--type=" in command_line or "--enable-automation" not in command_line:
+            continue
+        if "chrome" not in (process.info["name"] or "").lower():
+            continue
+        try:
+            parent = psutil.Process(process.info["ppid"])
+            parent_name = parent.name().lower()
+        except psutil.Error:
+            parent_name = ""
+        if "chromedriver" not in parent_name:
+            orphans.append(process)
+    return orphans
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find and kill orphaned automation Chrome processes')
+    parser.add_argument('command', choices=['orphans', 'reap'])
+
+    args = parser.parse_args()
+
+    if psutil is None:
+        print("❌ psutil is not installed (pip install psutil)")
+        sys.exit(1)
+
+    orphans = find_orphans()
+    if not orphans:
+        print("✅ No orphaned automation browsers")
+        return
+
+    for process in orphans:
+        try:
+            rss = sum(child.memory_info().rss for child in [process] + process.children(recursive=True))
+        except psutil.Error:
+            continue
+        print(f"🧟 pid {process.pid}: {rss / MB:.0f} MB")
+        if args.command == 'reap':
+            for child in process.children(recursive=True) + [process]:
+                try:
+                    child.kill()
+                except psutil.Error:
+                    pass
+    if args.command == 'reap':
+        print(f"🧹 Killed {len(orphans)} orphaned browser(s)")
+
+
+if __name__ == "__main__":
+    main()
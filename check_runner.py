@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Run the setup, connectivity and login checks with shared browser sessions
+"""
+
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from browser import create_driver
+from browser_memory import install_reaper
+from config import WEBSITES
+from log_setup import configure_logging
+import test_setup
+import test_connectivity
+import test_login
+
+
+# Checks that never touch a browser can run side by side
+LOCAL_CHECKS = [
+    ("Python Version", test_setup.test_python_version),
+    ("Selenium Import", test_setup.test_selenium_import),
+    ("Configuration Files", test_setup.test_config_files),
+    ("JSON Configuration", test_setup.test_json_config),
+    ("Website Handlers", test_setup.test_website_handlers)
+]
+
+
+def timed(name, func, *args, **kwargs):
+    """Run a check and return (name, passed, seconds)"""
+    start_time = time.perf_counter()
+    try:
+        passed = bool(func(*args, **kwargs))
+    except Exception as e:
+        print(f"❌ {name} - Exception: {e}")
+        passed = False
+    return name, passed, time.perf_counter() - start_time
+
+
+def run_local_checks():
+    """Run the browser-free setup checks concurrently"""
+    with ThreadPoolExecutor(max_workers=len(LOCAL_CHECKS)) as pool:
+        futures = [pool.submit(timed, name, func) for name, func in LOCAL_CHECKS]
+        return [future.result() for future in futures]
+
+
+def run_site_checks(website_names, driver=None, login=True):
+    """Run Chrome, connectivity and login checks for sites on one session.
+
+    Starts its own driver unless one is passed in, and always reuses it
+    for every check instead of launching a browser per check.
+    """
+    results = []
+    owns_driver = driver is None
+
+    start_time = time.perf_counter()
+    try:
+        if owns_driver:
+            driver = create_driver(headless=True, page_load_strategy="normal")
+        results.append(("Browser Startup", True, time.perf_counter() - start_time))
+    except Exception as e:
+        print(f"❌ Browser startup failed: {e}")
+        results.append(("Browser Startup", False, time.perf_counter() - start_time))
+        return results
+
+    try:
+        results.append(timed("Chrome WebDriver", test_setup.test_chrome_driver, driver))
+        for website_name in website_names:
+            results.append(timed(f"Connectivity ({website_name})",
+                                 test_connectivity.test_website_connectivity, website_name, driver))
+            if login:
+                results.append(timed(f"Login dry run ({website_name})",
+                                     test_login.test_login, website_name, True, False, driver))
+    finally:
+        if owns_driver:
+            driver.quit()
+
+    return results
+
+
+def run_all_checks(website_names, single_browser=False, login=True):
+    """Run local checks alongside the site checks and collect timings"""
+    with ThreadPoolExecutor(max_workers=len(website_names) + 1) as pool:
+        local = pool.submit(run_local_checks)
+        if single_browser:
+            sites = [pool.submit(run_site_checks, website_names, None, login)]
+        else:
+            sites = [pool.submit(run_site_checks, [name], None, login) for name in website_names]
+
+        results = [("Local", result) for result in local.result()]
+        for name, future in zip(["shared"] if single_browser else website_names, sites):
+            results.extend((name, result) for result in future.result())
+        return results
+
+
+def print_report(results, total_time):
+    """Print the consolidated pass/fail and timing report"""
+    print("\n" + "=" * 60)
+    print("📊 CHECK SUMMARY")
+    print("=" * 60)
+
+    for group, (name, passed, seconds) in results:
+        status = "✅ PASS" if passed else "❌ FAIL"
+        print(f"{status}  {seconds:7.2f}s  [{group}] {name}")
+
+    passed = sum(1 for _, (_, ok, _) in results if ok)
+    print(f"\n🎯 Results: {passed}/{len(results)} checks passed in {total_time:.2f}s wall time")
+    return passed == len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run pre-sale checks with shared browser sessions')
+    parser.add_argument('--website', action='append', help='Website to check (repeatable, default: all)')
+    parser.add_argument('--single-browser', action='store_true',
+                        help='Use one browser for all sites instead of one per site')
+    parser.add_argument('--skip-login', action='store_true', help='Skip the login dry run')
+
+    args = parser.parse_args()
+    configure_logging()
+    install_reaper(sigterm=True)
+
+    website_names = args.website or list(WEBSITES.keys())
+    unknown = [name for name in website_names if name not in WEBSITES]
+    if unknown:
+        print(f"❌ Website(s) not supported: {', '.join(unknown)}")
+        sys.exit(1)
+
+    print("🧪 PRE-SALE CHECK RUNNER")
+    print("=" * 50)
+
+    start_time = time.perf_counter()
+    results = run_all_checks(website_names, args.single_browser, not args.skip_login)
+    success = print_report(results, time.perf_counter() - start_time)
+
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
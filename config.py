@@ -5,6 +5,15 @@ WEBSITES = {
     "thaiticketmajor": {
         "base_url": "https://www.thaiticketmajor.com/concert/",
         "name": "Thai Ticket Major",
+        "field_locator": "id",
+        # Login is detected by any of these cookies or the logged-in marker.
+        # The sites' session cookie names are not confirmed yet, so the lists
+        # are empty and only the marker is used; test_login.py prints the
+        # cookies a login sets to pick them from.
+        "auth_cookies": [],
+        "logged_in_marker": "//a[contains(@href, 'logout') or contains(text(), 'ออกจากระบบ')]",
+        # True lets a run go on when the login is submitted but never confirmed
+        "lenient_login": False,
         "login_selectors": {
             "login_button": "//*[@class='btn-signin item d-none d-lg-inline-block']",
             "username_field": "username",
@@ -13,15 +22,38 @@ WEBSITES = {
         },
         "booking_selectors": {
             "concert_link": "partial_link_text",
+            "show_rows": "//div[@class='box-event-list']/div[2]/div",
             "show_selector": "//div[@class='box-event-list']/div[2]/div[{show}]/div[2]/span[1]/a[1]",
             "zone_map": "//*[@name='uMap2Map']/area",
             "seat_table": "//*[@id='tableseats']/tbody[1]/tr",
             "confirm_button": "ยืนยันที่นั่ง / Book Now"
+        },
+        "ready_selectors": {
+            "home": [("xpath", "//*[@class='btn-signin item d-none d-lg-inline-block']")],
+            "event": [("xpath", "//div[@class='box-event-list']")],
+            "zone": [("xpath", "//*[@name='uMap2Map']/area")],
+            "seats": [("xpath", "//*[@id='tableseats']/tbody[1]/tr")]
+        },
+        "seat_map": {
+            "container": "//*[@id='tableseats']/tbody[1]",
+            "cell": "tr > td:not(:first-child)",
+            "mode": "text"
+        },
+        "network_capture": {
+            # Zone availability is only read from zone URLs: seat records
+            # carry zone and status keys too
+            "zone_patterns": [r"(?i)^(?!.*seat).*zone"],
+            "seat_patterns": [r"(?i)seat"]
         }
     },
     "ticketmelon": {
         "base_url": "https://www.ticketmelon.com/",
         "name": "Ticket Melon",
+        "field_locator": "name",
+        "auth_cookies": [],
+        "logged_in_marker": "//a[contains(@href, 'logout')]",
+        # True lets a run go on when the login is submitted but never confirmed
+        "lenient_login": False,
         "login_selectors": {
             "login_button": "//a[contains(@class, 'login')]",
             "username_field": "email",
@@ -34,11 +66,34 @@ WEBSITES = {
             "zone_selector": "//div[contains(@class, 'zone')]",
             "seat_selector": "//div[contains(@class, 'seat')]",
             "confirm_button": "//button[contains(text(), 'Confirm')]"
+        },
+        "ready_selectors": {
+            "home": [("xpath", "//a[contains(@class, 'login')]")],
+            "event": [("xpath", "//div[contains(@class, 'show-time')]")],
+            "zone": [("xpath", "//div[contains(@class, 'zone')]")],
+            "seats": [("xpath", "//div[contains(@class, 'seat')]")]
+        },
+        "seat_map": {
+            # None: observe the closest element that holds every seat cell
+            "container": None,
+            "cell": "div[class*='seat']",
+            "mode": "class",
+            # Class token a free seat carries in "class" mode
+            "available_class": "available"
+        },
+        "network_capture": {
+            "zone_patterns": [r"(?i)^(?!.*seat).*zone"],
+            "seat_patterns": [r"(?i)seat"]
         }
     },
     "eventpop": {
         "base_url": "https://www.eventpop.me/",
         "name": "Eventpop",
+        "field_locator": "name",
+        "auth_cookies": [],
+        "logged_in_marker": "//a[contains(@href, 'sign_out') or contains(@href, 'logout')]",
+        # True lets a run go on when the login is submitted but never confirmed
+        "lenient_login": False,
         "login_selectors": {
             "login_button": "//button[contains(text(), 'เข้าสู่ระบบ')]",
             "username_field": "email",
@@ -51,6 +106,21 @@ WEBSITES = {
             "zone_selector": "//div[contains(@class, 'ticket-type')]",
             "seat_selector": "//button[contains(@class, 'seat')]",
             "confirm_button": "//button[contains(text(), 'จองตั๋ว')]"
+        },
+        "ready_selectors": {
+            "home": [("xpath", "//button[contains(text(), 'เข้าสู่ระบบ')]")],
+            "event": [("xpath", "//div[contains(@class, 'event-session')]")],
+            "zone": [("xpath", "//div[contains(@class, 'ticket-type')]")]
+        },
+        "seat_map": {
+            "container": None,
+            "cell": "button[class*='seat']",
+            "mode": "class",
+            "available_class": "available"
+        },
+        "network_capture": {
+            "zone_patterns": [r"(?i)^(?!.*seat).*zone"],
+            "seat_patterns": [r"(?i)seat"]
         }
     }
 }
@@ -58,4 +128,79 @@ WEBSITES = {
 # Default settings
 DEFAULT_WAIT_TIME = 30
 MAX_RETRY_ATTEMPTS = 3
-IMPLICIT_WAIT = 30
\ No newline at end of file
+IMPLICIT_WAIT = 30
+
+# Chrome page load strategy: "normal" waits for every asset, "eager" returns
+# at DOMContentLoaded and "none" returns immediately. Handlers wait on their
+# own ready_selectors, so third-party assets never block a stage.
+PAGE_LOAD_STRATEGY = "eager"
+
+# Named Chrome launch presets. "headless_mode" ("new" or "old") applies only
+# to headless sessions; "args", "window_size" and "page_load_strategy" to
+# all. launch_benchmark.py measures flag combinations and saves the winner
+# to chrome_presets.json, which adds to (or overrides) these. CHROME_PRESET
+# is the preset the booking automation uses; None keeps the built-in flags.
+CHROME_PRESETS = {
+    "baseline": {
+        "headless_mode": "new",
+        "args": ["--no-sandbox", "--disable-dev-shm-usage"],
+        "window_size": [1280, 800]
+    }
+}
+CHROME_PRESET = None
+
+# Pre-warmed profile (python profile_template.py warm): when this directory
+# exists every new session starts from a private copy of it, so the sites'
+# static assets come from the HTTP cache. None turns it off.
+PROFILE_TEMPLATE = "profile_template"
+
+# Handler command backend: "selenium" sends each command to chromedriver in
+# turn; "cdp" also opens an asyncio DevTools websocket (needs the optional
+# websockets package) for pipelined reads and pushed events.
+BROWSER_BACKEND = "selenium"
+
+# Chrome memory cap per session (browser plus renderers, in MB). Long
+# debugging sessions and benchmarks restart the browser once it is exceeded.
+CHROME_MEMORY_LIMIT_MB = 1500
+
+# Watch mode (--watch): seconds between availability checks of the chosen
+# show. Polls never come faster than the minimum; the interval backs off
+# while nothing changes, and Retry-After or cache headers can extend it.
+WATCH_MIN_INTERVAL = 30
+WATCH_MAX_INTERVAL = 300
+
+# Recovery policy per booking stage: extra attempts after an error, and
+# whether to "retry" in place or "resume" from the last good checkpoint
+STAGE_RECOVERY = {
+    "search_concert": {"retries": 1, "action": "resume"},
+    "select_show": {"retries": 2, "action": "resume"},
+    "select_zone": {"retries": 2, "action": "resume"},
+    "select_seats": {"retries": 2, "action": "retry"},
+    "confirm_booking": {"retries": 0, "action": "retry"}
+}
+
+# Log level per booking stage; stages not listed use LOG_LEVEL. Per-seat
+# messages are DEBUG, so seat selection only reports totals unless its
+# level is lowered here or --verbose is given.
+LOG_LEVEL = "INFO"
+LOG_STAGE_LEVELS = {
+    "select_seats": "INFO",
+    "confirm_booking": "INFO"
+}
+
+# Network condition profiles for fault_proxy.py; the first rule whose
+# pattern matches the URL applies. Latency values are in milliseconds.
+PROXY_PROFILES = {
+    "broadband": [
+        {"pattern": ".*", "latency": {"dist": "lognormal", "median_ms": 40, "sigma": 0.4}}
+    ],
+    "mobile_3g": [
+        {"pattern": ".*", "latency": {"dist": "lognormal", "median_ms": 300, "sigma": 0.5},
+         "bandwidth_kbps": 1600}
+    ],
+    "sale_rush": [
+        {"pattern": r"/(api|ajax)/|seat|zone", "latency": {"dist": "lognormal", "median_ms": 800, "sigma": 0.8},
+         "slow_rate": 0.1, "slow_ms": 5000, "drop_rate": 0.02, "error_rate": 0.05, "error_status": 503},
+        {"pattern": ".*", "latency": {"dist": "uniform", "min_ms": 100, "max_ms": 600}}
+    ]
+}
\ No newline at end of file
@@ -5,12 +5,16 @@ Debug tool to inspect website elements and selectors
 
 import sys
 import argparse
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from browser import create_driver
+from browser_memory import MemoryMonitor, sample_memory, install_reaper, exiting_on_signal
 from config import WEBSITES
+from log_setup import configure_logging, flush_logging
+from website_handlers.locators import HEALTH_JS, config_locators
+from snapshot_store import SnapshotStore
+import json
 import time
 
 
@@ -25,11 +29,13 @@ def debug_page_elements(website_name, page_type="main"):
     config = WEBSITES[website_name]
     
     # Setup Chrome driver (visible for debugging)
-    chrome_options = Options()
-    chrome_options.add_experimental_option("detach", True)
+    def open_browser():
+        browser = create_driver(headless=False, page_load_strategy="normal")
+        browser.maximize_window()
+        return browser
     
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.maximize_window()
+    driver = open_browser()
+    monitor = MemoryMonitor()
     
     try:
         # Navigate to website
@@ -93,17 +99,37 @@ def debug_page_elements(website_name, page_type="main"):
         print("  'click <xpath>' - Click element")
         print("  'text <xpath>' - Get element text")
         print("  'screenshot' - Take screenshot")
+        print("  'snapshot [stage]' - Save page HTML to the snapshot store")
+        print("  'memory' - Show browser memory use")
         print("  'quit' - Exit")
         
         while True:
+            # Restart the browser on the same page once it grows past the cap
+            driver = monitor.recycle_if_needed(driver, open_browser)
+            flush_logging()
             command = input("\n🔧 Enter command: ").strip()
             
             if command == 'quit':
                 break
+            elif command == 'memory':
+                sample = sample_memory(driver)
+                if not sample:
+                    print("❓ Memory use not available")
+                elif sample["source"] == "psutil":
+                    print(f"🧠 Browser {sample['browser']:.0f} MB, renderers {sample['renderer']:.0f} MB "
+                          f"(cap {monitor.limit_mb} MB, {monitor.recycles} restart(s))")
+                else:
+                    print(f"🧠 JS heap {sample['total']:.0f} MB (install psutil for process RSS)")
             elif command == 'screenshot':
                 filename = f"debug_{website_name}_{int(time.time())}.png"
                 driver.save_screenshot(filename)
                 print(f"📸 Screenshot saved: {filename}")
+            elif command == 'snapshot' or command.startswith('snapshot '):
+                stage = command[9:].strip() or page_type
+                store = SnapshotStore()
+                snapshot_id = store.put(driver.page_source, website_name, stage, driver.current_url)
+                store.close()
+                print(f"📦 Snapshot saved: {snapshot_id}")
             elif command.startswith('find '):
                 xpath = command[5:]
                 try:
@@ -140,10 +166,64 @@ def debug_page_elements(website_name, page_type="main"):
     finally:
         print("🔚 Debug session ended")
         # Don't auto-close in debug mode
-        input("Press Enter to close browser...")
+        flush_logging()
+        if not exiting_on_signal():
+            input("Press Enter to close browser...")
         driver.quit()
 
 
+def check_selectors(website_name, page_type="main", url=None, slow_ms=50.0):
+    """Evaluate every configured selector in one in-page script call"""
+    print(f"🩺 Checking selectors for {website_name} - {page_type} page...")
+    
+    if website_name not in WEBSITES:
+        print(f"❌ Website '{website_name}' not supported")
+        return None
+    
+    config = WEBSITES[website_name]
+    groups = {
+        "main": ("login_selectors", "booking_selectors"),
+        "login": ("login_selectors",),
+        "booking": ("booking_selectors",)
+    }[page_type]
+    selectors = [[f"{group}.{name}", by, value] for group, name, by, value in config_locators(config, groups)]
+    
+    driver = None
+    try:
+        driver = create_driver(headless=True, page_load_strategy="normal")
+        page_url = url or config['base_url']
+        print(f"📡 Navigating to {page_url}...")
+        driver.get(page_url)
+        
+        results = driver.execute_script(HEALTH_JS, selectors)
+        for result in results:
+            result["broken"] = result["count"] == 0
+            result["slow"] = result["ms"] > slow_ms
+            
+            status = "❌" if result["broken"] else ("🐢" if result["slow"] else "✅")
+            print(f"{status} {result['name']}: {result['count']} found, "
+                  f"{result['visible']} visible, {result['ms']:.2f} ms")
+            if result.get("error"):
+                print(f"   Error: {result['error']}")
+        
+        return {
+            "website": website_name,
+            "page": page_type,
+            "url": page_url,
+            "checked_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "slow_ms": slow_ms,
+            "selectors": results
+        }
+        
+    except Exception as e:
+        print(f"❌ Selector check failed: {e}")
+        return None
+        
+    finally:
+        if driver:
+            driver.quit()
+
+
 def main():
     parser = argparse.ArgumentParser(description='Debug website elements')
     parser.add_argument('--website', required=True, help='Website to debug')
@@ -151,11 +231,31 @@ def main():
                        choices=['main', 'login', 'booking'],
                        help='Page type to debug')
     
+    parser.add_argument('--check', action='store_true',
+                       help='Non-interactive selector health check')
+    parser.add_argument('--url', help='Page to check instead of the base URL')
+    parser.add_argument('--slow-ms', type=float, default=50.0,
+                       help='Flag selectors slower than this (ms)')
+    parser.add_argument('--report', help='Write the health check report as JSON')
+    
     args = parser.parse_args()
+    configure_logging()
+    install_reaper(sigterm=True)
     
     print("🐛 ELEMENT DEBUGGING TOOL")
     print("=" * 50)
     
+    if args.check:
+        report = check_selectors(args.website, args.page, args.url, args.slow_ms)
+        if report and args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"📄 Report saved: {args.report}")
+        flagged = [r for r in report["selectors"] if r["broken"] or r["slow"]] if report else []
+        if flagged:
+            print(f"⚠️ {len(flagged)} selector(s) flagged as slow or broken")
+        sys.exit(0 if report and not flagged else 1)
+    
     success = debug_page_elements(args.website, args.page)
     
     sys.exit(0 if success else 1)
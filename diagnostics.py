@@ -0,0 +1,118 @@
+"""Failure-only diagnostics kept in a small in-memory ring buffer"""
+
+import json
+import os
+import time
+from collections import deque
+from snapshot_store import SnapshotStore
+
+
+# URL and title where a stage starts, in one round-trip
+STAGE_SNAPSHOT_JS = "return [location.href, document.title];"
+
+# Truncated DOM excerpt of the failing page
+DOM_EXCERPT_JS = """
+var root = document.body || document.documentElement;
+return root ? root.outerHTML.slice(0, arguments[0]) : '';
+"""
+
+
+class CommandLog:
+    """Record every WebDriver command name and duration in a bounded deque.
+
+    Wraps ``driver.execute``, the single path all Selenium commands take.
+    Parameters are not kept, so typed credentials never reach the log.
+    """
+
+    def __init__(self, driver, maxlen=200):
+        self.entries = deque(maxlen=maxlen)
+        self.count = 0
+        execute = driver.execute
+
+        def logged_execute(driver_command, params=None):
+            start_time = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                self.count += 1
+                self.entries.append((driver_command, time.perf_counter() - start_time))
+
+        driver.execute = logged_execute
+
+
+class DiagnosticRing:
+    """Keep the last few stage records and write them out only on failure"""
+
+    def __init__(self, driver, site, capacity=20, excerpt_chars=20000, output_dir="diagnostics"):
+        self.driver = driver
+        self.site = site
+        self.records = deque(maxlen=capacity)
+        self.excerpt_chars = excerpt_chars
+        self.output_dir = output_dir
+        self.commands = CommandLog(driver)
+
+    def record(self, stage):
+        """Remember where a stage started; one small script call, no DOM"""
+        try:
+            url, title = self.driver.execute_script(STAGE_SNAPSHOT_JS)
+        except Exception:
+            url, title = None, None
+        self.records.append({
+            "stage": stage,
+            "time": time.time(),
+            "url": url,
+            "title": title,
+            "dom": None,
+            "commands": list(self.commands.entries)[-50:]
+        })
+
+    def flush(self, stage, error):
+        """Write the ring, the failing page's DOM excerpt and one screenshot to disk.
+
+        The full failing page also goes into the snapshot store for replay.
+        """
+        # Capture the failing page itself as the last record, with its DOM
+        self.record(f"{stage} (failed)")
+        try:
+            excerpt = self.driver.execute_script(DOM_EXCERPT_JS, self.excerpt_chars) or ""
+        except Exception:
+            excerpt = ""
+        self.records[-1]["dom"] = excerpt
+
+        folder = os.path.join(self.output_dir, f"{self.site}_{time.strftime('%Y%m%d_%H%M%S')}")
+        os.makedirs(folder, exist_ok=True)
+
+        summary = {"site": self.site, "failed_stage": stage, "error": str(error),
+                   "commands_total": self.commands.count, "records": []}
+        for index, record in enumerate(self.records):
+            dom_file = None
+            if record["dom"] is not None:
+                dom_file = f"{index:02d}_dom.html"
+                with open(os.path.join(folder, dom_file), "w", encoding="utf-8") as f:
+                    f.write(record["dom"])
+            summary["records"].append({
+                "stage": record["stage"],
+                "time": record["time"],
+                "url": record["url"],
+                "title": record["title"],
+                "dom_file": dom_file,
+                "commands": [{"command": name, "seconds": round(seconds, 4)}
+                             for name, seconds in record["commands"]]
+            })
+
+        try:
+            self.driver.save_screenshot(os.path.join(folder, "screenshot.png"))
+        except Exception:
+            pass
+
+        try:
+            store = SnapshotStore()
+            summary["snapshot_id"] = store.put(self.driver.page_source, self.site, stage, self.driver.current_url)
+            store.close()
+        except Exception:
+            pass
+
+        with open(os.path.join(folder, "diagnostics.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        return folder
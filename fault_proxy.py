@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Local HTTP proxy that injects latency, bandwidth limits and faults
+
+Plain-HTTP requests (e.g. the mock site) are matched against rule patterns
+by full URL. HTTPS goes through an opaque CONNECT tunnel, so rules only see
+``https://host:port/``: path-based patterns never match real sites, and a
+fault or delay applies once per tunnel rather than per request.
+"""
+
+import json
+import math
+import random
+import re
+import select
+import socket
+import sys
+import threading
+import time
+import argparse
+import http.client
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from config import PROXY_PROFILES
+
+
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "proxy-authorization",
+              "te", "trailer", "transfer-encoding", "upgrade"}
+CHUNK_SIZE = 16384
+
+
+class FaultRule:
+    """Network conditions for requests whose URL matches ``pattern``.
+
+    ``latency`` is ``{"dist": "fixed"|"uniform"|"normal"|"lognormal", ...}``
+    in milliseconds. Rates are probabilities per request: ``drop_rate``
+    closes the connection without a response, ``slow_rate`` adds
+    ``slow_ms`` and ``error_rate`` answers ``error_status`` instead of
+    forwarding. ``bandwidth_kbps`` caps the response body rate.
+    """
+
+    def __init__(self, spec):
+        self.pattern = re.compile(spec.get("pattern", ".*"))
+        self.latency = spec.get("latency", {"dist": "fixed", "ms": 0})
+        self.bandwidth_kbps = spec.get("bandwidth_kbps")
+        self.drop_rate = spec.get("drop_rate", 0.0)
+        self.slow_rate = spec.get("slow_rate", 0.0)
+        self.slow_ms = spec.get("slow_ms", 0)
+        self.error_rate = spec.get("error_rate", 0.0)
+        self.error_status = spec.get("error_status", 503)
+
+    def sample_delay(self, rng):
+        """Delay in seconds drawn from the latency distribution"""
+        latency = self.latency
+        dist = latency.get("dist", "fixed")
+        if dist == "uniform":
+            ms = rng.uniform(latency["min_ms"], latency["max_ms"])
+        elif dist == "normal":
+            ms = rng.gauss(latency["mean_ms"], latency.get("stddev_ms", 0))
+        elif dist == "lognormal":
+            ms = rng.lognormvariate(math.log(latency["median_ms"]), latency.get("sigma", 0.5))
+        else:
+            ms = latency.get("ms", 0)
+        return max(ms, 0) / 1000.0
+
+    def decide(self, rng):
+        """Draw the fate of one request: (fault, delay_seconds)"""
+        delay = self.sample_delay(rng)
+        if rng.random() < self.slow_rate:
+            delay += self.slow_ms / 1000.0
+        roll = rng.random()
+        if roll < self.drop_rate:
+            return "drop", delay
+        if roll < self.drop_rate + self.error_rate:
+            return "error", delay
+        return None, delay
+
+
+class FaultInjector:
+    """Pick the rule for a URL and draw reproducible outcomes.
+
+    Each outcome comes from an RNG seeded with the seed, the URL and how many
+    times that URL was requested, so a run sees the same faults in the same
+    places however the browser interleaves its requests.
+    """
+
+    def __init__(self, rules, seed=0):
+        self.rules = [FaultRule(spec) for spec in rules]
+        self.seed = seed
+        self.seen = Counter()
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    def decide(self, url):
+        rule = next((rule for rule in self.rules if rule.pattern.search(url)), None)
+        if rule is None:
+            return None, None, 0.0
+        with self.lock:
+            self.seen[url] += 1
+            occurrence = self.seen[url]
+        rng = random.Random(f"{self.seed}:{url}:{occurrence}")
+        fault, delay = rule.decide(rng)
+        with self.lock:
+            self.stats[fault or "ok"] += 1
+        return rule, fault, delay
+
+
+class FaultProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_CONNECT(self):
+        # HTTPS is tunnelled, so only the host is visible to the rules
+        rule, fault, delay = self.server.injector.decide(f"https://{self.path}/")
+        time.sleep(delay)
+        if fault == "drop":
+            self.close_connection = True
+            return
+        if fault == "error":
+            self.send_error(rule.error_status)
+            return
+
+        host, _, port = self.path.rpartition(":")
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=30)
+        except OSError:
+            self.send_error(502)
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.tunnel(upstream, rule.bandwidth_kbps if rule else None)
+
+    def tunnel(self, upstream, bandwidth_kbps):
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets, 30)
+                if errored or not readable:
+                    break
+                for source in readable:
+                    data = source.recv(CHUNK_SIZE)
+                    if not data:
+                        return
+                    target = upstream if source is self.connection else self.connection
+                    if source is upstream and bandwidth_kbps:
+                        time.sleep(len(data) / (bandwidth_kbps * 125.0))
+                    target.sendall(data)
+        finally:
+            upstream.close()
+            self.close_connection = True
+
+    def forward(self):
+        rule, fault, delay = self.server.injector.decide(self.path)
+        time.sleep(delay)
+        if fault == "drop":
+            self.close_connection = True
+            return
+        # Read the request body even when faulting, so the next request on a
+        # keep-alive connection does not start inside it
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        if fault == "error":
+            message = b"Injected fault"
+            self.send_response(rule.error_status)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(message)))
+            self.end_headers()
+            self.wfile.write(message)
+            return
+
+        url = urlsplit(self.path)
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_BY_HOP}
+        connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        upstream = connection_class(url.netloc, timeout=30)
+        try:
+            path = url.path or "/"
+            if url.query:
+                path += "?" + url.query
+            upstream.request(self.command, path, body or None, headers)
+            response = upstream.getresponse()
+            payload = response.read()
+        except OSError:
+            self.send_error(502)
+            return
+        finally:
+            upstream.close()
+
+        # Pass the upstream Date and Server headers through instead of ours
+        self.log_request(response.status)
+        self.send_response_only(response.status, response.reason)
+        for name, value in response.getheaders():
+            if name.lower() not in HOP_BY_HOP and name.lower() != "content-length":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+
+        bandwidth_kbps = rule.bandwidth_kbps if rule else None
+        for start in range(0, len(payload), CHUNK_SIZE):
+            chunk = payload[start:start + CHUNK_SIZE]
+            if bandwidth_kbps:
+                time.sleep(len(chunk) / (bandwidth_kbps * 125.0))
+            self.wfile.write(chunk)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = forward
+
+
+class FaultProxy(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, rules, seed=0, host="127.0.0.1", port=0, verbose=False):
+        super().__init__((host, port), FaultProxyHandler)
+        self.injector = FaultInjector(rules, seed)
+        self.verbose = verbose
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def profile_rules(name):
+    """Rules of a named profile from config.PROXY_PROFILES"""
+    if name not in PROXY_PROFILES:
+        raise ValueError(f"Unknown proxy profile '{name}' (available: {', '.join(PROXY_PROFILES)})")
+    return PROXY_PROFILES[name]
+
+
+def start_proxy(rules, seed=0, port=0, verbose=False):
+    """Serve the proxy from a background thread; returns the server"""
+    proxy = FaultProxy(rules, seed, port=port, verbose=verbose)
+    threading.Thread(target=proxy.serve_forever, daemon=True).start()
+    return proxy
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Latency and fault-injection proxy for benchmarks',
+        epilog='Per-URL rules only work on plain-HTTP sites such as the mock site. HTTPS is '
+               'tunnelled, so rules see just https://host:port/ and act once per connection.')
+    parser.add_argument('--profile', help=f'Named profile from config.py ({", ".join(PROXY_PROFILES)})')
+    parser.add_argument('--rules', help='JSON file with a list of rules (overrides --profile)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for reproducible faults')
+    parser.add_argument('--port', type=int, default=8899, help='Port to listen on')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+
+    args = parser.parse_args()
+
+    if args.rules:
+        with open(args.rules, 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+    elif args.profile:
+        try:
+            rules = profile_rules(args.profile)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    else:
+        print("❌ Give --profile or --rules")
+        sys.exit(1)
+
+    proxy = FaultProxy(rules, args.seed, port=args.port, verbose=args.verbose)
+    print(f"🌩️ Fault proxy on {proxy.url} (seed {args.seed}, {len(rules)} rules)")
+    print(f"   Use: python ticket_automation.py --proxy {proxy.url}")
+    print("   HTTPS is tunnelled: rules match only https://host:port/, once per connection")
+    try:
+        proxy.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.server_close()
+        print(f"\n📊 Outcomes: {dict(proxy.injector.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Profile page load latency for all websites in parallel
+"""
+
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from browser import create_driver
+from browser_memory import MemoryMonitor, install_reaper
+from config import WEBSITES
+from log_setup import configure_logging
+from fault_proxy import profile_rules, start_proxy
+from timing_stats import summarize
+
+
+PHASES = ["dns", "connect", "ttfb", "dom_content_loaded", "load"]
+
+NAVIGATION_TIMING_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav) {
+    return null;
+}
+return {
+    dns: nav.domainLookupEnd - nav.domainLookupStart,
+    connect: nav.connectEnd - nav.connectStart,
+    ttfb: nav.responseStart - nav.requestStart,
+    dom_content_loaded: nav.domContentLoadedEventEnd - nav.startTime,
+    load: nav.loadEventEnd - nav.startTime
+};
+"""
+
+
+def profile_site(website_name, url, repeats=5, interval=2.0, cold=True, proxy=None):
+    """Load one site repeatedly in its own browser and collect timings"""
+    samples = {phase: [] for phase in PHASES}
+    errors = []
+
+    def open_browser():
+        # Normal strategy so loadEventEnd is set when get() returns; no
+        # profile template, whose cache the cold loads would clear anyway
+        browser = create_driver(headless=True, page_load_strategy="normal", proxy=proxy, profile_template=False)
+        browser.set_page_load_timeout(30)
+        return browser
+
+    driver = None
+    monitor = MemoryMonitor()
+    try:
+        driver = open_browser()
+
+        for attempt in range(repeats):
+            if attempt:
+                time.sleep(interval)  # Be respectful with requests
+                driver = monitor.recycle_if_needed(driver, open_browser)
+            if cold:
+                driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            try:
+                driver.get(url)
+                timing = driver.execute_script(NAVIGATION_TIMING_JS)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            if timing:
+                for phase in PHASES:
+                    samples[phase].append(timing[phase])
+
+    except Exception as e:
+        errors.append(str(e))
+
+    finally:
+        if driver:
+            driver.quit()
+
+    return {
+        "website": website_name,
+        "url": url,
+        "phases": {phase: summarize(values) for phase, values in samples.items()},
+        "peak_memory_mb": round(monitor.peak_mb, 1),
+        "browser_restarts": monitor.recycles,
+        "errors": errors
+    }
+
+
+def profile_sites(targets, repeats=5, interval=2.0, cold=True, workers=3, proxy=None):
+    """Profile every (website, url) target concurrently, one browser each"""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(profile_site, name, url, repeats, interval, cold, proxy) for name, url in targets]
+        return [future.result() for future in futures]
+
+
+def print_report(results):
+    """Print p50/p95 per phase for each site"""
+    print("\n" + "=" * 70)
+    print("📊 NAVIGATION TIMING (ms, p50 / p95)")
+    print("=" * 70)
+    print(f"{'Website':<18}" + "".join(f"{phase:>18}" for phase in PHASES))
+
+    for result in results:
+        row = f"{result['website']:<18}"
+        for phase in PHASES:
+            stats = result["phases"][phase]
+            if stats["count"]:
+                row += f"{stats['p50']:>9.0f} / {stats['p95']:<6.0f}"
+            else:
+                row += f"{'-':>18}"
+        print(row)
+        for error in result["errors"]:
+            print(f"   ⚠️ {result['website']}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile page load latency')
+    parser.add_argument('--website', action='append', help='Website to profile (repeatable, default: all)')
+    parser.add_argument('--url', help='URL to load instead of the base URL (e.g. local mock server)')
+    parser.add_argument('--repeats', type=int, default=5, help='Loads per site')
+    parser.add_argument('--interval', type=float, default=2.0, help='Seconds between loads of one site')
+    parser.add_argument('--workers', type=int, default=3, help='Sites profiled at the same time')
+    parser.add_argument('--warm', action='store_true', help='Keep the browser cache between loads')
+    parser.add_argument('--report', help='Write results as JSON')
+    parser.add_argument('--proxy', help='Send browser traffic through this proxy (e.g. a running fault_proxy.py)')
+    parser.add_argument('--fault-profile', help='Start an in-process fault proxy with this profile from config.py')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the in-process fault proxy')
+
+    args = parser.parse_args()
+    configure_logging()
+    install_reaper(sigterm=True)
+
+    websites = args.website or list(WEBSITES.keys())
+    unknown = [name for name in websites if name not in WEBSITES]
+    if unknown:
+        print(f"❌ Website(s) not supported: {', '.join(unknown)}")
+        sys.exit(1)
+
+    targets = [(name, args.url or WEBSITES[name]['base_url']) for name in websites]
+
+    print("⏱️ LATENCY PROFILER")
+    print("=" * 50)
+    print(f"Profiling {len(targets)} site(s), {args.repeats} load(s) each...")
+
+    proxy_url = args.proxy
+    fault_proxy = None
+    if args.fault_profile:
+        try:
+            fault_proxy = start_proxy(profile_rules(args.fault_profile), args.seed)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        proxy_url = fault_proxy.url
+        print(f"🌩️ Network profile '{args.fault_profile}' (seed {args.seed}) via {proxy_url}")
+
+    results = profile_sites(targets, args.repeats, args.interval, not args.warm, args.workers, proxy_url)
+    if fault_proxy:
+        fault_proxy.shutdown()
+        print(f"📊 Proxy outcomes: {dict(fault_proxy.injector.stats)}")
+    print_report(results)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Report saved: {args.report}")
+
+    sys.exit(0 if all(not r["errors"] for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
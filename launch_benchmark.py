@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Benchmark Chrome launch flags on the booking flow against a mock site
+"""
+
+import itertools
+import json
+import sys
+import time
+import argparse
+from browser import PRESETS_FILE, create_driver, save_preset
+from browser_memory import sample_memory, install_reaper
+from config import WEBSITES
+from log_setup import configure_logging
+from timing_stats import summarize
+from website_handlers import ThaiTicketMajorHandler, TicketMelonHandler, EventpopHandler
+
+
+HANDLERS = {
+    "thaiticketmajor": ThaiTicketMajorHandler,
+    "ticketmelon": TicketMelonHandler,
+    "eventpop": EventpopHandler
+}
+
+# Booking stages up to, not including, the confirmation
+FLOW = ["setup", "search_concert", "select_show", "select_zone", "select_seats"]
+
+# Flags every configuration needs to start in a container
+BASE_ARGS = ["--no-sandbox"]
+
+# Each dimension maps a choice to the preset fields it sets. The first
+# choice is the baseline, used when the dimension is not varied.
+DIMENSIONS = {
+    # Chrome 132 and later only ship the new mode; "old" needs chrome-headless-shell
+    "headless": {
+        "new": {"headless_mode": "new"},
+        "old": {"headless_mode": "old"}
+    },
+    "dev_shm": {
+        "disable-dev-shm-usage": {"args": ["--disable-dev-shm-usage"]},
+        "default": {}
+    },
+    "gpu": {
+        "default": {},
+        "disable-gpu": {"args": ["--disable-gpu"]}
+    },
+    "extensions": {
+        "default": {},
+        "disabled": {"args": ["--disable-extensions", "--disable-component-extensions-with-background-pages"]}
+    },
+    "page_load": {
+        "eager": {"page_load_strategy": "eager"},
+        "normal": {"page_load_strategy": "normal"},
+        "none": {"page_load_strategy": "none"}
+    },
+    "window": {
+        "1280x800": {"window_size": [1280, 800]},
+        "1920x1080": {"window_size": [1920, 1080]}
+    }
+}
+
+
+def build_matrix(vary):
+    """(name, preset) for every combination of the varied dimensions"""
+    choices = [list(options) if dimension in vary else list(options)[:1]
+               for dimension, options in DIMENSIONS.items()]
+    matrix = []
+    for combination in itertools.product(*choices):
+        preset = {"args": list(BASE_ARGS)}
+        for dimension, choice in zip(DIMENSIONS, combination):
+            fields = DIMENSIONS[dimension][choice]
+            preset["args"] += fields.get("args", [])
+            preset.update({key: value for key, value in fields.items() if key != "args"})
+        name = ", ".join(f"{dimension}={choice}" for dimension, choice in zip(DIMENSIONS, combination)
+                         if dimension in vary)
+        matrix.append((name or "baseline", preset))
+    return matrix
+
+
+def run_flow(preset, website_name, config, user_details, profile_template=False):
+    """Start one browser with ``preset`` and run the booking flow on it.
+
+    Startup includes the profile template copy when ``profile_template``
+    is set.
+    """
+    run = {"startup": None, "stages": {}, "memory_mb": None, "memory_source": None, "error": None}
+    started = time.perf_counter()
+    # Performance log on, as in a booking run, for the handlers' readiness events
+    driver = create_driver(headless=True, performance_log=True, preset=preset,
+                           profile_template=None if profile_template else False)
+    run["startup"] = time.perf_counter() - started
+
+    handler = None
+    stage = FLOW[0]
+    try:
+        handler = HANDLERS[website_name](driver, config, user_details)
+        for stage in FLOW:
+            stage_started = time.perf_counter()
+            # Stages report some failures (no show, no seat clicked) by
+            # returning False; such a run skipped work and must not count
+            if getattr(handler, stage)() is False:
+                run["error"] = f"{stage}: returned False"
+                break
+            run["stages"][stage] = time.perf_counter() - stage_started
+            sample = sample_memory(driver)
+            if sample:
+                run["memory_mb"] = max(run["memory_mb"] or 0.0, sample["total"])
+                run["memory_source"] = sample["source"]
+    except Exception as e:
+        run["error"] = f"{stage}: {e}"
+    finally:
+        if handler:
+            handler.close()
+        driver.quit()
+    return run
+
+
+def benchmark(matrix, website_name, config, user_details, repeats=3, interval=1.0, profile_template=False):
+    """Run the flow ``repeats`` times per configuration and summarise it"""
+    results = []
+    for number, (name, preset) in enumerate(matrix, 1):
+        print(f"🚀 [{number}/{len(matrix)}] {name}")
+        runs = []
+        for attempt in range(repeats):
+            if attempt:
+                time.sleep(interval)
+            try:
+                runs.append(run_flow(preset, website_name, config, user_details, profile_template))
+            except Exception as e:
+                runs.append({"startup": None, "stages": {}, "memory_mb": None, "memory_source": None,
+                             "error": f"startup: {e}"})
+
+        complete = [run for run in runs if not run["error"]]
+        stages = {stage: summarize([run["stages"][stage] for run in complete]) for stage in FLOW}
+        startup = summarize([run["startup"] for run in complete])
+        total = startup["p50"] + sum(stats["p50"] for stats in stages.values()) if complete else None
+        results.append({
+            "name": name,
+            "preset": preset,
+            "startup": startup,
+            "stages": stages,
+            "total_p50": total,
+            "memory_mb": summarize([run["memory_mb"] for run in complete if run["memory_mb"] is not None]),
+            "memory_source": next((run["memory_source"] for run in complete if run["memory_source"]), None),
+            "errors": [run["error"] for run in runs if run["error"]]
+        })
+    return results
+
+
+def best_result(results):
+    """Fastest configuration whose every run completed the flow"""
+    eligible = [result for result in results if not result["errors"] and result["total_p50"] is not None]
+    return min(eligible, key=lambda result: result["total_p50"]) if eligible else None
+
+
+def print_report(results):
+    """Print startup, per-stage p50 and memory per configuration, fastest first"""
+    print("\n" + "=" * 100)
+    print("📊 LAUNCH CONFIGURATIONS (seconds p50, memory MB peak p50)")
+    print("=" * 100)
+    print(f"{'Configuration':<50}{'startup':>9}" + "".join(f"{stage[:12]:>13}" for stage in FLOW)
+          + f"{'total':>9}{'memory':>9}")
+
+    ranked = sorted(results, key=lambda result: (result["total_p50"] is None, result["total_p50"] or 0))
+    for result in ranked:
+        row = f"{result['name'][:49]:<50}"
+        if result["total_p50"] is None:
+            print(row + "   failed")
+        else:
+            row += f"{result['startup']['p50']:>9.2f}"
+            row += "".join(f"{result['stages'][stage]['p50']:>13.2f}" for stage in FLOW)
+            memory = result["memory_mb"]
+            row += f"{result['total_p50']:>9.2f}" + (f"{memory['p50']:>9.0f}" if memory["count"] else f"{'-':>9}")
+            print(row)
+        for error in result["errors"]:
+            print(f"   ⚠️ {error}")
+
+    source = next((result["memory_source"] for result in results if result["memory_source"]), None)
+    if source == "cdp":
+        print("\nℹ️ Memory is the page's JS heap; install psutil for browser and renderer RSS")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Chrome launch flags on the booking flow')
+    parser.add_argument('--url', required=True, help='Mock site to run the flow against (e.g. http://localhost:8000/)')
+    parser.add_argument('--website', default='thaiticketmajor', help='Handler to run the flow with')
+    parser.add_argument('--user-details', default='userdetail.json', help='Concert, show, zone and seats to use')
+    parser.add_argument('--vary', action='append', choices=list(DIMENSIONS) + ['all'],
+                        help='Dimension to vary (repeatable; "all" for the full matrix); '
+                        'others stay at their baseline. Default: baseline only')
+    parser.add_argument('--repeats', type=int, default=3, help='Flow runs per configuration')
+    parser.add_argument('--profile-template', action='store_true',
+                        help='Start each browser from a copy of the profile template (default: empty profile)')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between runs')
+    parser.add_argument('--save-preset', metavar='NAME', help=f'Save the fastest configuration to {PRESETS_FILE}')
+    parser.add_argument('--report', help='Write results as JSON')
+
+    args = parser.parse_args()
+    configure_logging()
+    install_reaper(sigterm=True)
+
+    if args.website not in HANDLERS:
+        print(f"❌ Website not supported: {args.website}")
+        sys.exit(1)
+
+    try:
+        with open(args.user_details, 'r', encoding='utf-8') as f:
+            user_details = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read {args.user_details}: {e}")
+        sys.exit(1)
+
+    config = dict(WEBSITES[args.website], base_url=args.url)
+    vary = args.vary or []
+    matrix = build_matrix(list(DIMENSIONS) if 'all' in vary else vary)
+
+    print("🧪 LAUNCH FLAG BENCHMARK")
+    print("=" * 50)
+    print(f"{len(matrix)} configuration(s) x {args.repeats} run(s) of the {args.website} flow on {args.url}")
+
+    results = benchmark(matrix, args.website, config, user_details, args.repeats, args.interval,
+                        args.profile_template)
+    print_report(results)
+
+    best = best_result(results)
+    if best is None:
+        print("\n❌ No configuration completed the flow")
+    else:
+        print(f"\n🏆 Fastest: {best['name']} ({best['total_p50']:.2f}s)")
+        if args.save_preset:
+            save_preset(args.save_preset, best["preset"])
+            print(f"💾 Saved as preset '{args.save_preset}' in {PRESETS_FILE}")
+            print(f"   Use: python ticket_automation.py --preset {args.save_preset} (or set CHROME_PRESET in config.py)")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Report saved: {args.report}")
+
+    sys.exit(0 if best else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Non-blocking structured logging for the booking flow.
+
+Loggers hand records to an unbounded queue; a background listener thread
+does the formatting and terminal or file writes, so a burst of messages
+during seat selection never waits on I/O. Records carry the current
+booking stage, which selects the stage's log level and appears in the
+JSON output.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from config import LOG_LEVEL, LOG_STAGE_LEVELS
+
+
+current_stage = contextvars.ContextVar("current_stage", default=None)
+
+_listener = None
+_queue = None
+
+
+def set_stage(stage):
+    """Tag records logged from here on with a booking stage"""
+    current_stage.set(stage)
+
+
+class StageFilter(logging.Filter):
+    """Attach the current stage and apply that stage's level"""
+
+    def __init__(self, default_level, stage_levels):
+        super().__init__()
+        self.default_level = default_level
+        self.stage_levels = stage_levels
+
+    def filter(self, record):
+        record.stage = current_stage.get()
+        return record.levelno >= self.stage_levels.get(record.stage, self.default_level)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "stage": getattr(record, "stage", None),
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(verbose=False, json_output=False, log_file=None):
+    """Route all logging through a queue to a background writer.
+
+    ``verbose`` lowers every stage to DEBUG. Plain output is just the
+    message, as the scripts printed it before; ``json_output`` switches to
+    JSON lines.
+    """
+    global _listener, _queue
+    if _listener:
+        return
+
+    if verbose:
+        default_level, stage_levels = logging.DEBUG, {}
+    else:
+        default_level = logging.getLevelName(LOG_LEVEL)
+        stage_levels = {stage: logging.getLevelName(level) for stage, level in LOG_STAGE_LEVELS.items()}
+
+    output = logging.FileHandler(log_file, encoding="utf-8") if log_file else logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if json_output else logging.Formatter("%(message)s"))
+
+    # queue.Queue is unbounded, so put() never blocks; join() lets
+    # flush_logging wait for the writer
+    _queue = queue.Queue()
+    queue_handler = QueueHandler(_queue)
+    queue_handler.addFilter(StageFilter(default_level, stage_levels))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    # Records below every configured level are dropped before they are built
+    root.setLevel(min([default_level, *stage_levels.values()]))
+    # Selenium and urllib3 log every WebDriver command at DEBUG
+    for name in ("selenium", "urllib3"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    _listener = QueueListener(_queue, output)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def flush_logging(timeout=2.0):
+    """Wait until queued records are written, e.g. before prompting for input"""
+    if not _queue:
+        return
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def stop_logging():
+    """Write out anything still queued and stop the writer thread"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,140 @@
+"""Pre-warmed Chrome profile template with the sites' static assets cached.
+
+``warm`` loads each site once in a dedicated user-data-dir so Chrome's HTTP
+cache holds their cacheable JS, CSS and images, then clears cookies and
+site storage so later sessions behave as on a fresh profile. Sessions made
+by ``browser.create_driver`` start from a private copy of the template and
+delete it on quit.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import argparse
+from urllib.parse import urlsplit
+from selenium import webdriver
+from browser_memory import install_reaper, track
+from config import PROFILE_TEMPLATE, WEBSITES
+from log_setup import configure_logging
+
+
+# Per-process lock files: a copy that kept them would look in use
+SKIP_PATTERNS = ("Singleton*", "lockfile", "Crashpad")
+
+# Everything an origin keeps except the HTTP cache
+CLEARED_STORAGE = "cookies,local_storage,indexeddb,websql,service_workers,cache_storage,shader_cache"
+
+
+def copy_template(template):
+    """Copy the template to a new temporary user-data-dir and return its path"""
+    profile = tempfile.mkdtemp(prefix="chrome-profile-")
+    # copytree uses the kernel's zero-copy file copy where the platform has one
+    shutil.copytree(template, profile, ignore=shutil.ignore_patterns(*SKIP_PATTERNS), dirs_exist_ok=True)
+    return profile
+
+
+def remove_profile(profile):
+    shutil.rmtree(profile, ignore_errors=True)
+
+
+def template_size(template):
+    """Bytes used by the template on disk"""
+    total = 0
+    for folder, _, files in os.walk(template):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(folder, name))
+            except OSError:
+                pass
+    return total
+
+
+def warm(urls, template=PROFILE_TEMPLATE, settle=3.0):
+    """Populate ``template`` by loading every URL once.
+
+    Pages are loaded with the normal strategy so every asset is fetched,
+    then given ``settle`` seconds for late requests. Cookies and site
+    storage are cleared before Chrome exits; only the HTTP cache is kept.
+    """
+    # Imported here so browser.py can use this module without a cycle
+    from browser import build_chrome_options
+
+    os.makedirs(template, exist_ok=True)
+    chrome_options = build_chrome_options(headless=True, page_load_strategy="normal")
+    chrome_options.add_argument(f"--user-data-dir={os.path.abspath(template)}")
+    driver = track(webdriver.Chrome(options=chrome_options))
+    driver.set_page_load_timeout(60)
+
+    loaded = []
+    try:
+        for url in urls:
+            try:
+                started = time.perf_counter()
+                driver.get(url)
+                time.sleep(settle)
+                loaded.append(url)
+                print(f"🔥 {url} ({time.perf_counter() - started:.1f}s)")
+            except Exception as e:
+                print(f"⚠️ {url}: {e}")
+
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for url in urls:
+            parts = urlsplit(url)
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                "origin": f"{parts.scheme}://{parts.netloc}",
+                "storageTypes": CLEARED_STORAGE
+            })
+    finally:
+        # A clean quit lets Chrome write its cache index
+        driver.quit()
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or inspect the pre-warmed Chrome profile template')
+    parser.add_argument('command', choices=['warm', 'info', 'clear'])
+    parser.add_argument('--website', action='append', help='Website to warm (repeatable, default: all)')
+    parser.add_argument('--url', action='append', help='Extra page to warm, e.g. an event page (repeatable)')
+    parser.add_argument('--template', default=PROFILE_TEMPLATE, help='Template directory')
+
+    args = parser.parse_args()
+    configure_logging()
+    install_reaper(sigterm=True)
+
+    if not args.template:
+        print("❌ No template directory (set PROFILE_TEMPLATE in config.py or pass --template)")
+        sys.exit(1)
+
+    if args.command == 'clear':
+        remove_profile(args.template)
+        print(f"🧹 Removed {args.template}")
+        return
+
+    if args.command == 'info':
+        if not os.path.isdir(args.template):
+            print(f"❌ No template at {args.template}; run: python profile_template.py warm")
+            sys.exit(1)
+        age_hours = (time.time() - os.path.getmtime(args.template)) / 3600
+        print(f"📦 {args.template}: {template_size(args.template) / (1024 * 1024):.1f} MB, "
+              f"warmed {age_hours:.1f} hours ago")
+        return
+
+    websites = args.website or list(WEBSITES.keys())
+    unknown = [name for name in websites if name not in WEBSITES]
+    if unknown:
+        print(f"❌ Website(s) not supported: {', '.join(unknown)}")
+        sys.exit(1)
+
+    # Start from scratch so nothing from an earlier warm run lingers
+    remove_profile(args.template)
+    urls = [WEBSITES[name]['base_url'] for name in websites] + (args.url or [])
+    print(f"🔥 Warming {args.template} with {len(urls)} page(s)...")
+    loaded = warm(urls, args.template)
+    print(f"✅ Cached {len(loaded)}/{len(urls)} page(s), {template_size(args.template) / (1024 * 1024):.1f} MB")
+    sys.exit(0 if len(loaded) == len(urls) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Persistent run history with per-stage latency regression checks.
+
+Every booking run, dry run and test script appends one row per run and one
+per timed stage to a local SQLite file. The ``history`` command shows the
+recent trend per stage and flags stages whose p95 grew beyond a threshold
+compared with an earlier baseline window of runs.
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+import argparse
+from timing_stats import percentile, summarize
+
+
+DEFAULT_PATH = "run_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    script TEXT NOT NULL,
+    site TEXT NOT NULL,
+    git_rev TEXT,
+    outcome TEXT,
+    commands INTEGER,
+    seat_map_size INTEGER
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    stage TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    commands INTEGER
+);
+CREATE INDEX IF NOT EXISTS stages_by_name ON stages(stage, run_id);
+"""
+
+
+def git_revision():
+    """Short commit hash of the checkout, or None outside a git tree"""
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                timeout=5, cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class RunHistory:
+    """Append-only store of runs and their stage timings"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def record_run(self, script, site, stages, outcome=None, commands=None, seat_map_size=None, started=None):
+        """Store one run.
+
+        ``stages`` is a list of ``(stage, seconds, commands)`` tuples; a stage
+        that ran more than once (retries, repeats) simply appears again.
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (started, script, site, git_rev, outcome, commands, seat_map_size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (started or time.time(), script, site, git_revision(), outcome, commands, seat_map_size))
+            self.connection.executemany(
+                "INSERT INTO stages (run_id, stage, seconds, commands) VALUES (?, ?, ?, ?)",
+                [(cursor.lastrowid, stage, seconds, stage_commands) for stage, seconds, stage_commands in stages])
+        return cursor.lastrowid
+
+    def runs(self, site=None, script=None, limit=20):
+        """Most recent runs, newest first"""
+        query = "SELECT id, started, script, site, git_rev, outcome, commands, seat_map_size FROM runs"
+        conditions, params = self._filters(site, script)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id DESC LIMIT ?"
+        return self.connection.execute(query, params + [limit]).fetchall()
+
+    def stage_samples(self, site=None, script=None):
+        """Stage durations keyed by ``(site, stage)``, each list ordered oldest run first"""
+        query = ("SELECT runs.site, stages.stage, stages.run_id, stages.seconds "
+                 "FROM stages JOIN runs ON runs.id = stages.run_id")
+        conditions, params = self._filters(site, script)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY stages.run_id"
+
+        samples = {}
+        for site_name, stage, run_id, seconds in self.connection.execute(query, params):
+            samples.setdefault((site_name, stage), []).append((run_id, seconds))
+        return samples
+
+    def regressions(self, site=None, script=None, baseline_runs=20, recent_runs=5, threshold=1.25):
+        """Compare each stage's p95 over its latest runs with the runs before them.
+
+        Returns one dict per site and stage with enough history; ``regressed``
+        is set when the recent p95 exceeds the baseline p95 by ``threshold``.
+        """
+        report = []
+        for (site_name, stage), samples in self.stage_samples(site, script).items():
+            run_ids = sorted({run_id for run_id, _ in samples})
+            if len(run_ids) <= recent_runs:
+                continue
+            recent_ids = set(run_ids[-recent_runs:])
+            baseline_ids = set(run_ids[-(recent_runs + baseline_runs):-recent_runs])
+
+            recent = [seconds for run_id, seconds in samples if run_id in recent_ids]
+            baseline = [seconds for run_id, seconds in samples if run_id in baseline_ids]
+            baseline_p95 = percentile(baseline, 95)
+            recent_p95 = percentile(recent, 95)
+            ratio = recent_p95 / baseline_p95 if baseline_p95 else float("inf")
+            report.append({
+                "site": site_name,
+                "stage": stage,
+                "baseline_runs": len(baseline_ids),
+                "baseline_p95": baseline_p95,
+                "recent_p95": recent_p95,
+                "ratio": ratio,
+                "regressed": ratio > threshold
+            })
+        return report
+
+    @staticmethod
+    def _filters(site, script):
+        conditions, params = [], []
+        if site:
+            conditions.append("runs.site = ?")
+            params.append(site)
+        if script:
+            conditions.append("runs.script = ?")
+            params.append(script)
+        return conditions, params
+
+    def close(self):
+        self.connection.close()
+
+
+def print_history(history, site=None, script=None, limit=10, baseline_runs=20, recent_runs=5, threshold=1.25):
+    """Print recent runs, per-stage trends and p95 regressions"""
+    runs = history.runs(site, script, limit)
+    if not runs:
+        print("No runs recorded yet")
+        return True
+
+    print(f"🗂️ Last {len(runs)} runs")
+    for run_id, started, run_script, run_site, git_rev, outcome, commands, seat_map_size in runs:
+        when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))
+        extras = []
+        if commands is not None:
+            extras.append(f"{commands} commands")
+        if seat_map_size is not None:
+            extras.append(f"{seat_map_size} seats in map")
+        print(f"  #{run_id:<5} {when}  {run_script:<22} {run_site:<16} {git_rev or '-':<9} "
+              f"{outcome or '-':<10} {', '.join(extras)}")
+
+    print("\n📈 Stage trends (seconds)")
+    for (site_name, stage), samples in history.stage_samples(site, script).items():
+        stats = summarize([seconds for _, seconds in samples])
+        recent = " ".join(f"{seconds:.2f}" for _, seconds in samples[-8:])
+        print(f"  {site_name + '/' + stage:<40} n={stats['count']:<4} "
+              f"p50 {stats['p50']:.3f}  p95 {stats['p95']:.3f}  last: {recent}")
+
+    report = history.regressions(site, script, baseline_runs, recent_runs, threshold)
+    regressed = [entry for entry in report if entry["regressed"]]
+    print(f"\n🔎 p95 of last {recent_runs} runs vs up to {baseline_runs} runs before them (threshold {threshold:.2f}x)")
+    if not report:
+        print("  Not enough runs for a comparison yet")
+    for entry in report:
+        status = "⚠️ REGRESSED" if entry["regressed"] else "✅ ok"
+        name = f"{entry['site']}/{entry['stage']}"
+        print(f"  {status:<12} {name:<40} {entry['baseline_p95']:.3f}s -> {entry['recent_p95']:.3f}s "
+              f"({entry['ratio']:.2f}x over {entry['baseline_runs']} baseline runs)")
+
+    return not regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show run history and latency regressions')
+    parser.add_argument('command', choices=['history'])
+    parser.add_argument('--db', default=DEFAULT_PATH, help='History database file')
+    parser.add_argument('--site', help='Filter by website')
+    parser.add_argument('--script', help='Filter by script (e.g. ticket_automation, test_login)')
+    parser.add_argument('--limit', type=int, default=10, help='Runs to list')
+    parser.add_argument('--baseline', type=int, default=20, help='Runs in the baseline window')
+    parser.add_argument('--recent', type=int, default=5, help='Latest runs compared against the baseline')
+    parser.add_argument('--threshold', type=float, default=1.25, help='p95 ratio that counts as a regression')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ No history at {args.db}")
+        sys.exit(1)
+
+    history = RunHistory(args.db)
+    ok = print_history(history, args.site, args.script, args.limit, args.baseline, args.recent, args.threshold)
+    history.close()
+
+    # Non-zero exit lets a check script fail on a regression
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
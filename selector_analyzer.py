@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Measure configured selector cost and propose faster equivalents
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import tempfile
+from pathlib import Path
+from browser import create_driver
+from browser_memory import install_reaper
+from config import WEBSITES
+from log_setup import configure_logging
+from snapshot_store import SnapshotStore
+from website_handlers.locators import LOCATE_JS, config_locators
+
+
+STEP_PATTERN = re.compile(r"(//|/)(\*|[a-zA-Z][\w-]*)((?:\[[^\]]*\])*)")
+PREDICATE_PATTERN = re.compile(r"\[([^\]]*)\]")
+POSITION_PATTERN = re.compile(r"^\s*(\d+)\s*$")
+EQUALS_PATTERN = re.compile(r"""^\s*@([\w-]+)\s*=\s*(['"])(.*)\2\s*$""")
+CONTAINS_PATTERN = re.compile(r"""^\s*contains\(\s*@([\w-]+)\s*,\s*(['"])(.*)\2\s*\)\s*$""")
+HAS_ATTRIBUTE_PATTERN = re.compile(r"^\s*@([\w-]+)\s*$")
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z][\w-]*$")
+
+# Evaluates the original locator and each candidate repeatedly, then checks
+# that every candidate returns exactly the same elements in the same order
+COMPARE_JS = LOCATE_JS + """
+var original = arguments[0];
+var candidates = arguments[1];
+var iterations = arguments[2];
+
+function measure(by, value) {
+    var found = [];
+    var started = performance.now();
+    try {
+        for (var i = 0; i < iterations; i++) {
+            found = locateAll(by, value);
+        }
+    } catch (error) {
+        return {by: by, value: value, count: 0, ms: 0, error: String(error), found: []};
+    }
+    return {by: by, value: value, count: found.length,
+            ms: (performance.now() - started) / iterations, found: found};
+}
+
+var base = measure(original[0], original[1]);
+var results = candidates.map(function (candidate) {
+    var result = measure(candidate[0], candidate[1]);
+    result.equivalent = !result.error && result.found.length === base.found.length &&
+        result.found.every(function (element, i) { return element === base.found[i]; });
+    delete result.found;
+    return result;
+});
+delete base.found;
+return {original: base, candidates: results};
+"""
+
+
+def css_string(value):
+    """Quote a value for use inside a CSS attribute selector"""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def xpath_to_css(xpath):
+    """Translate a simple XPath to an equivalent CSS selector, or None.
+
+    Supports child and descendant steps with tag or ``*`` tests, equality,
+    ``contains(@attr, ...)`` and presence predicates, plus a leading
+    positional predicate on named tags. Anything involving text(), axes or
+    functions has no CSS equivalent and returns None.
+    """
+    if not xpath.startswith("//"):
+        return None
+
+    steps = list(STEP_PATTERN.finditer(xpath))
+    if not steps or "".join(step.group(0) for step in steps) != xpath:
+        return None
+
+    parts = []
+    for index, step in enumerate(steps):
+        axis, tag, predicates = step.groups()
+        css = "" if tag == "*" else tag
+
+        for position, predicate in enumerate(PREDICATE_PATTERN.findall(predicates)):
+            match = POSITION_PATTERN.match(predicate)
+            if match:
+                # Only a leading position counts siblings of the same tag
+                if position != 0 or tag == "*":
+                    return None
+                css += f":nth-of-type({match.group(1)})"
+                continue
+
+            match = EQUALS_PATTERN.match(predicate)
+            if match:
+                name, _, value = match.groups()
+                if name == "id" and IDENTIFIER_PATTERN.match(value):
+                    css += f"#{value}"
+                else:
+                    css += f"[{name}={css_string(value)}]"
+                continue
+
+            match = CONTAINS_PATTERN.match(predicate)
+            if match:
+                name, _, value = match.groups()
+                css += f"[{name}*={css_string(value)}]"
+                continue
+
+            match = HAS_ATTRIBUTE_PATTERN.match(predicate)
+            if match:
+                css += f"[{match.group(1)}]"
+                continue
+
+            return None
+
+        css = css or "*"
+        if index == 0:
+            parts.append(css)
+        else:
+            parts.append((" > " if axis == "/" else " ") + css)
+
+    return "".join(parts)
+
+
+def anchored_xpath(xpath):
+    """Start an XPath from id() when its first step is ``//*[@id='...']``"""
+    match = re.match(r"""^//\*\[@id=(['"])([^'"]+)\1\](.*)$""", xpath)
+    if not match:
+        return None
+    return f"id('{match.group(2)}'){match.group(3)}"
+
+
+def analyze_selectors(website_name, url=None, snapshot=None, iterations=50):
+    """Time each configured XPath and verify its proposed equivalents"""
+    print(f"🔬 Analyzing selectors for {website_name}...")
+
+    if website_name not in WEBSITES:
+        print(f"❌ Website '{website_name}' not supported")
+        return None
+
+    config = WEBSITES[website_name]
+    page_url = Path(snapshot).resolve().as_uri() if snapshot else (url or config['base_url'])
+
+    driver = None
+    try:
+        driver = create_driver(headless=True, page_load_strategy="normal")
+        print(f"📡 Loading {page_url}...")
+        driver.get(page_url)
+
+        results = []
+        for group, name, by, value in config_locators(config):
+            if by != "xpath":
+                continue
+
+            candidates = []
+            css = xpath_to_css(value)
+            if css:
+                candidates.append(["css selector", css])
+            anchored = anchored_xpath(value)
+            if anchored:
+                candidates.append(["xpath", anchored])
+
+            comparison = driver.execute_script(COMPARE_JS, [by, value], candidates, iterations)
+            comparison["name"] = f"{group}.{name}"
+            results.append(comparison)
+            print_comparison(comparison)
+
+        return {"website": website_name, "url": page_url, "iterations": iterations, "selectors": results}
+
+    except Exception as e:
+        print(f"❌ Selector analysis failed: {e}")
+        return None
+
+    finally:
+        if driver:
+            driver.quit()
+
+
+def print_comparison(comparison):
+    """Print one selector's timing and its verified alternatives"""
+    original = comparison["original"]
+    print(f"\n🔍 {comparison['name']}: {original['value']}")
+    print(f"   {original['count']} found, {original['ms'] * 1000:.1f} µs per evaluation")
+
+    if not comparison["candidates"]:
+        print("   No CSS or anchored equivalent")
+    for candidate in comparison["candidates"]:
+        if not candidate["equivalent"]:
+            print(f"   ❌ {candidate['value']} - not equivalent on this page")
+        elif original["count"] == 0:
+            print(f"   ⚠️ {candidate['value']} - unverified, no matches on this page")
+        else:
+            speedup = original["ms"] / candidate["ms"] if candidate["ms"] else float("inf")
+            print(f"   ✅ {candidate['value']} - {candidate['ms'] * 1000:.1f} µs ({speedup:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze selector cost and propose CSS equivalents')
+    parser.add_argument('--website', required=True, help='Website whose selectors to analyze')
+    parser.add_argument('--url', help='Page to load instead of the base URL (e.g. mock site)')
+    parser.add_argument('--snapshot', help='Captured HTML file to analyze offline')
+    parser.add_argument('--snapshot-id', help='Snapshot store entry to analyze offline')
+    parser.add_argument('--iterations', type=int, default=50, help='Evaluations per selector')
+    parser.add_argument('--report', help='Write results as JSON')
+
+    args = parser.parse_args()
+    configure_logging()
+    install_reaper(sigterm=True)
+
+    print("🔬 SELECTOR COST ANALYZER")
+    print("=" * 50)
+
+    snapshot = args.snapshot
+    if args.snapshot_id:
+        store = SnapshotStore()
+        stored = store.get(args.snapshot_id)
+        if not stored:
+            print(f"❌ Snapshot '{args.snapshot_id}' not found")
+            sys.exit(1)
+        snapshot = os.path.join(tempfile.mkdtemp(), f"{stored.id}.html")
+        with open(snapshot, 'w', encoding='utf-8') as f:
+            f.write(stored.html())
+        store.close()
+
+    report = analyze_selectors(args.website, args.url, snapshot, args.iterations)
+
+    if report and args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 Report saved: {args.report}")
+
+    sys.exit(0 if report else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Content-addressed, compressed store for captured HTML pages.
+
+Pages are split into content-defined chunks so an edit only changes the
+chunks around it. Each distinct chunk is stored once, zlib-compressed, in
+an append-only pack file. Snapshots are indexed by site, stage and
+timestamp and read back lazily through a memory-mapped view of the pack.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+import zlib
+import argparse
+
+
+MIN_CHUNK = 2048
+MAX_CHUNK = 65536
+# Cut a chunk when the low 13 bits of the rolling hash are zero (~8 KB average)
+BOUNDARY_MASK = (1 << 13) - 1
+
+# Fixed pseudo-random table for the gear rolling hash
+GEAR = [int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], "little") for i in range(256)]
+
+
+def split_chunks(data):
+    """Split bytes into content-defined chunks with a gear rolling hash"""
+    chunks = []
+    start = 0
+    rolling = 0
+    length = len(data)
+    for position in range(length):
+        rolling = ((rolling << 1) + GEAR[data[position]]) & 0xFFFFFFFF
+        size = position - start + 1
+        if (size >= MIN_CHUNK and not rolling & BOUNDARY_MASK) or size >= MAX_CHUNK:
+            chunks.append(data[start:position + 1])
+            start = position + 1
+            rolling = 0
+    if start < length:
+        chunks.append(data[start:])
+    return chunks
+
+
+class Snapshot:
+    """Index entry for one capture; the HTML is only assembled on demand"""
+
+    def __init__(self, store, entry):
+        self.store = store
+        self.id = entry["id"]
+        self.site = entry["site"]
+        self.stage = entry["stage"]
+        self.timestamp = entry["timestamp"]
+        self.url = entry.get("url")
+        self.size = entry["size"]
+        self.chunks = entry["chunks"]
+
+    def html(self):
+        """Reassemble the page from its chunks"""
+        return b"".join(self.store.read_chunk(digest) for digest in self.chunks).decode("utf-8")
+
+
+class SnapshotStore:
+    """Deduplicating snapshot store in a single directory"""
+
+    def __init__(self, root="snapshots"):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.pack_path = os.path.join(root, "chunks.pack")
+        self.chunk_index_path = os.path.join(root, "chunks.idx")
+        self.snapshot_index_path = os.path.join(root, "snapshots.jsonl")
+        self.chunk_offsets = {}
+        self._mmap = None
+        self._mmap_size = 0
+        self._load_chunk_index()
+
+    def _load_chunk_index(self):
+        if not os.path.exists(self.chunk_index_path):
+            return
+        with open(self.chunk_index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                digest, offset, length = line.split()
+                self.chunk_offsets[digest] = (int(offset), int(length))
+
+    def put(self, html, site, stage, url=None, timestamp=None):
+        """Store a page and return its snapshot id; only new chunks are written"""
+        data = html.encode("utf-8")
+        digests = []
+        new_entries = []
+
+        with open(self.pack_path, "ab") as pack:
+            for chunk in split_chunks(data):
+                digest = hashlib.sha256(chunk).hexdigest()
+                digests.append(digest)
+                if digest in self.chunk_offsets:
+                    continue
+                compressed = zlib.compress(chunk, 6)
+                offset = pack.tell()
+                pack.write(compressed)
+                self.chunk_offsets[digest] = (offset, len(compressed))
+                new_entries.append(f"{digest} {offset} {len(compressed)}\n")
+
+        if new_entries:
+            with open(self.chunk_index_path, "a", encoding="utf-8") as f:
+                f.writelines(new_entries)
+
+        timestamp = timestamp or time.time()
+        entry = {
+            "id": hashlib.sha256("".join(digests).encode("ascii")).hexdigest()[:16] + f"-{int(timestamp * 1000)}",
+            "site": site,
+            "stage": stage,
+            "timestamp": timestamp,
+            "url": url,
+            "size": len(data),
+            "chunks": digests
+        }
+        with open(self.snapshot_index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        return entry["id"]
+
+    def find(self, site=None, stage=None, since=None, until=None):
+        """Snapshots matching the filters, oldest first"""
+        if not os.path.exists(self.snapshot_index_path):
+            return []
+        snapshots = []
+        with open(self.snapshot_index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if site and entry["site"] != site:
+                    continue
+                if stage and entry["stage"] != stage:
+                    continue
+                if since and entry["timestamp"] < since:
+                    continue
+                if until and entry["timestamp"] > until:
+                    continue
+                snapshots.append(Snapshot(self, entry))
+        return snapshots
+
+    def get(self, snapshot_id):
+        """Snapshot by id, or None"""
+        return next((snapshot for snapshot in self.find() if snapshot.id == snapshot_id), None)
+
+    def read_chunk(self, digest):
+        """Decompress one chunk from the memory-mapped pack file"""
+        offset, length = self.chunk_offsets[digest]
+        if self._mmap is None or offset + length > self._mmap_size:
+            self._remap()
+        return zlib.decompress(self._mmap[offset:offset + length])
+
+    def _remap(self):
+        # The pack only grows, so remap when a chunk lies past the old end
+        self.close()
+        with open(self.pack_path, "rb") as pack:
+            self._mmap = mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mmap_size = len(self._mmap)
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def stats(self):
+        """Raw bytes captured versus bytes on disk"""
+        snapshots = self.find()
+        raw = sum(snapshot.size for snapshot in snapshots)
+        packed = os.path.getsize(self.pack_path) if os.path.exists(self.pack_path) else 0
+        return {"snapshots": len(snapshots), "chunks": len(self.chunk_offsets),
+                "raw_bytes": raw, "packed_bytes": packed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect the DOM snapshot store')
+    parser.add_argument('command', choices=['list', 'stats', 'export'])
+    parser.add_argument('--root', default='snapshots', help='Store directory')
+    parser.add_argument('--site', help='Filter by website')
+    parser.add_argument('--stage', help='Filter by stage')
+    parser.add_argument('--id', help='Snapshot id to export')
+    parser.add_argument('--output', help='File to export the snapshot HTML to')
+
+    args = parser.parse_args()
+    store = SnapshotStore(args.root)
+
+    if args.command == 'list':
+        for snapshot in store.find(args.site, args.stage):
+            captured = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot.timestamp))
+            print(f"{snapshot.id}  {captured}  {snapshot.site:<16} {snapshot.stage:<24} {snapshot.size:>9} B")
+    elif args.command == 'stats':
+        stats = store.stats()
+        ratio = stats['raw_bytes'] / stats['packed_bytes'] if stats['packed_bytes'] else 0
+        print(f"📦 {stats['snapshots']} snapshots, {stats['chunks']} unique chunks")
+        print(f"   {stats['raw_bytes']:,} B captured -> {stats['packed_bytes']:,} B on disk ({ratio:.1f}x)")
+    elif args.command == 'export':
+        snapshot = store.get(args.id) if args.id else None
+        if not snapshot:
+            print("❌ Snapshot not found")
+            sys.exit(1)
+        output = args.output or f"{snapshot.id}.html"
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(snapshot.html())
+        print(f"📄 Snapshot exported: {output}")
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Per-stage profiling with pstats output and collapsed-stack flamegraphs"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def categorize(filename, function):
+    """Bucket a profiled function by where its client-side time goes"""
+    path = filename.replace("\\", "/")
+    if function == "<built-in method time.sleep>":
+        return "sleep"
+    if path == "~" and any(name in function for name in ("recv", "select", "poll")):
+        # Blocking socket reads are the time spent waiting for the browser
+        return "waiting on browser"
+    if "/json/" in path or "_json" in function:
+        return "json encoding"
+    if any(part in path for part in ("/urllib3/", "/http/client", "/socket.py", "/ssl.py")):
+        return "http connection"
+    if "/selenium/" in path:
+        return "selenium"
+    if path.startswith(PROJECT_DIR.replace("\\", "/")):
+        return "our code"
+    return "other"
+
+
+class StackSampler:
+    """Sample one thread's Python stack at a fixed interval"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write_collapsed(self, path):
+        """Write stacks in the collapsed format used by flamegraph.pl and speedscope"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class StageProfiler:
+    """Profile each stage deterministically and by sampling.
+
+    Every stage writes ``<stage>.pstats`` and ``<stage>.collapsed`` to the
+    output directory.
+    """
+
+    def __init__(self, output_dir=None, interval=0.005):
+        self.output_dir = output_dir or os.path.join("profiles", time.strftime("%Y%m%d_%H%M%S"))
+        self.interval = interval
+        self.stages = []
+        self._names = Counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Profile the code run inside the ``with`` block"""
+        self._names[name] += 1
+        label = name if self._names[name] == 1 else f"{name}_{self._names[name]}"
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        profile = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        start_time = time.perf_counter()
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            sampler.stop()
+            elapsed = time.perf_counter() - start_time
+
+            stats_path = os.path.join(self.output_dir, f"{label}.pstats")
+            profile.dump_stats(stats_path)
+            sampler.write_collapsed(os.path.join(self.output_dir, f"{label}.collapsed"))
+            self.stages.append((label, elapsed, stats_path))
+
+    def print_summary(self, top=15):
+        """Print stage wall times, time per category and top self-time functions"""
+        if not self.stages:
+            return
+
+        print("\n" + "=" * 70)
+        print("🔥 PROFILE SUMMARY")
+        print("=" * 70)
+        for label, elapsed, _ in self.stages:
+            print(f"{label:<30} {elapsed:8.3f}s")
+
+        combined = pstats.Stats(*[path for _, _, path in self.stages])
+        categories = Counter()
+        functions = []
+        for (filename, line, function), (_, _, tottime, _, _) in combined.stats.items():
+            category = categorize(filename, function)
+            categories[category] += tottime
+            functions.append((tottime, category, f"{function} ({os.path.basename(filename)}:{line})"))
+
+        print("\nSelf time by category:")
+        for category, seconds in categories.most_common():
+            print(f"  {category:<22} {seconds:8.3f}s")
+
+        print(f"\nTop {top} functions by self time:")
+        for tottime, category, name in sorted(functions, reverse=True)[:top]:
+            print(f"  {tottime:8.3f}s  {category:<22} {name}")
+
+        print(f"\n📁 Profiles written to {self.output_dir}")
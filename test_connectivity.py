@@ -5,17 +5,27 @@ Test website connectivity and basic navigation
 
 import sys
 import argparse
+from contextlib import nullcontext
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from config import WEBSITES
+from log_setup import configure_logging
+from run_history import RunHistory
+from stage_profiler import StageProfiler
 import time
 
 
-def test_website_connectivity(website_name):
-    """Test basic connectivity to website"""
+def test_website_connectivity(website_name, driver=None, timings=None):
+    """Test basic connectivity to website.
+    
+    Pass a running ``driver`` to reuse its session; it is left open. Pass a
+    ``timings`` dict to receive the page load and login button times.
+    """
+    if timings is None:
+        timings = {}
     print(f"🌐 Testing connectivity to {website_name}...")
     
     if website_name not in WEBSITES:
@@ -30,9 +40,10 @@ def test_website_connectivity(website_name):
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     
-    driver = None
+    owns_driver = driver is None
     try:
-        driver = webdriver.Chrome(options=chrome_options)
+        if owns_driver:
+            driver = webdriver.Chrome(options=chrome_options)
         driver.set_page_load_timeout(30)
         
         # Test basic page load
@@ -40,6 +51,7 @@ def test_website_connectivity(website_name):
         start_time = time.time()
         driver.get(config['base_url'])
         load_time = time.time() - start_time
+        timings['page_load'] = load_time
         
         print(f"✅ Page loaded in {load_time:.2f} seconds")
         print(f"📄 Page title: {driver.title}")
@@ -49,9 +61,11 @@ def test_website_connectivity(website_name):
         login_button_xpath = login_selectors['login_button']
         
         try:
+            start_time = time.time()
             login_element = WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.XPATH, login_button_xpath))
             )
+            timings['login_button'] = time.time() - start_time
             print("✅ Login button found - Website structure intact")
         except:
             print("⚠️ Login button not found - Website may have changed")
@@ -70,11 +84,18 @@ def test_website_connectivity(website_name):
         return False
         
     finally:
-        if driver:
+        if driver and owns_driver:
             driver.quit()
 
 
-def test_all_websites():
+def record_connectivity(history, website_name, timings, passed):
+    """Append one connectivity test's timings to the run history"""
+    if history:
+        stages = [(name, seconds, None) for name, seconds in timings.items()]
+        history.record_run("test_connectivity", website_name, stages, outcome="passed" if passed else "failed")
+
+
+def test_all_websites(history=None):
     """Test connectivity to all supported websites"""
     print("🌍 Testing all supported websites...")
     print("=" * 50)
@@ -82,7 +103,9 @@ def test_all_websites():
     results = {}
     for website_name in WEBSITES.keys():
         print(f"\n🎯 Testing {WEBSITES[website_name]['name']}...")
-        results[website_name] = test_website_connectivity(website_name)
+        timings = {}
+        results[website_name] = test_website_connectivity(website_name, timings=timings)
+        record_connectivity(history, website_name, timings, results[website_name])
         time.sleep(2)  # Be respectful with requests
     
     # Summary
@@ -105,24 +128,37 @@ def main():
     parser = argparse.ArgumentParser(description='Test website connectivity')
     parser.add_argument('--website', help='Specific website to test')
     parser.add_argument('--all', action='store_true', help='Test all websites')
+    parser.add_argument('--profile', action='store_true', help='Profile the test and write flamegraph stacks')
+    parser.add_argument('--no-history', action='store_true', help='Do not append timings to run_history.db')
     
     args = parser.parse_args()
+    configure_logging()
     
     if args.website:
-        success = test_website_connectivity(args.website)
+        website = args.website
     elif args.all:
-        success = test_all_websites()
+        website = 'all'
     else:
         print("Available websites:")
         for key, value in WEBSITES.items():
             print(f"  - {key}: {value['name']}")
         
         website = input("\nEnter website to test (or 'all' for all): ").strip().lower()
-        
+    
+    history = None if args.no_history else RunHistory()
+    profiler = StageProfiler() if args.profile else None
+    with profiler.stage("connectivity") if profiler else nullcontext():
         if website == 'all':
-            success = test_all_websites()
+            success = test_all_websites(history)
         else:
-            success = test_website_connectivity(website)
+            timings = {}
+            success = test_website_connectivity(website, timings=timings)
+            record_connectivity(history, website, timings, success)
+    
+    if profiler:
+        profiler.print_summary()
+    if history:
+        history.close()
     
     sys.exit(0 if success else 1)
 
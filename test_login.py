@@ -6,17 +6,45 @@ Test login functionality for ticket booking websites
 import sys
 import argparse
 import json
+from contextlib import nullcontext
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from browser import create_driver
+from browser_memory import MemoryMonitor, install_reaper, exiting_on_signal
 from config import WEBSITES
+from log_setup import configure_logging, flush_logging
+from run_history import RunHistory
+from stage_profiler import StageProfiler
+from timing_stats import summarize
+from website_handlers.locators import is_authenticated
 import time
 
 
-def test_login(website_name, dry_run=True, debug=False):
-    """Test login functionality"""
+PHASES = ["button_clickable", "form_render", "credential_entry", "submit_to_authenticated"]
+
+# Login request(s) issued after the submit mark, from the Resource Timing API
+LOGIN_RESOURCES_JS = """
+var since = arguments[0];
+return performance.getEntriesByType('resource').filter(function (entry) {
+    return entry.startTime >= since &&
+        (entry.initiatorType === 'xmlhttprequest' || entry.initiatorType === 'fetch');
+}).map(function (entry) {
+    return {name: entry.name, start: entry.startTime, duration: entry.duration,
+            ttfb: entry.responseStart - entry.requestStart};
+});
+"""
+
+
+def test_login(website_name, dry_run=True, debug=False, driver=None, base_url=None, timings=None):
+    """Test login functionality.
+    
+    Pass a running ``driver`` to reuse its session; it is left open.
+    Pass a ``timings`` dict to receive the duration of each login phase.
+    """
     print(f"🔐 Testing login for {website_name}...")
     
     if website_name not in WEBSITES:
@@ -32,6 +60,8 @@ def test_login(website_name, dry_run=True, debug=False):
         return False
     
     config = WEBSITES[website_name]
+    if timings is None:
+        timings = {}
     
     # Setup Chrome driver
     chrome_options = Options()
@@ -40,55 +70,63 @@ def test_login(website_name, dry_run=True, debug=False):
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     
-    driver = None
+    owns_driver = driver is None
     try:
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.implicitly_wait(30)
+        if owns_driver:
+            driver = webdriver.Chrome(options=chrome_options)
+        # Explicit waits only, so implicit polling does not skew phase timings
+        driver.implicitly_wait(0)
         
         # Navigate to website
-        print(f"📡 Navigating to {config['base_url']}...")
-        driver.get(config['base_url'])
+        page_url = base_url or config['base_url']
+        print(f"📡 Navigating to {page_url}...")
+        driver.get(page_url)
         
         if debug:
             print("🔍 Debug mode: Browser will stay open for inspection")
+            flush_logging()
             input("Press Enter to continue with login test...")
         
         # Find and click login button
         login_selectors = config['login_selectors']
+        field_by = config.get('field_locator', By.ID)
         print("🔍 Looking for login button...")
         
+        phase_start = time.perf_counter()
         login_button = WebDriverWait(driver, 15).until(
             EC.element_to_be_clickable((By.XPATH, login_selectors['login_button']))
         )
-        print("✅ Login button found")
+        timings['button_clickable'] = time.perf_counter() - phase_start
+        print(f"✅ Login button found ({timings['button_clickable']:.2f}s)")
         
         if dry_run:
             print("🏃 Dry run mode: Stopping before actual login")
             print("✅ Login elements accessible - Test passed")
             return True
         
-        # Click login button
-        login_button.click()
-        time.sleep(2)
-        
-        # Find username field
+        # Click login button and wait for the form
         print("🔍 Looking for username field...")
+        phase_start = time.perf_counter()
+        login_button.click()
         username_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, login_selectors['username_field']))
+            EC.visibility_of_element_located((field_by, login_selectors['username_field']))
         )
         print("✅ Username field found")
         
         # Find password field
         print("🔍 Looking for password field...")
         password_field = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, login_selectors['password_field']))
+            EC.visibility_of_element_located((field_by, login_selectors['password_field']))
         )
-        print("✅ Password field found")
+        timings['form_render'] = time.perf_counter() - phase_start
+        print(f"✅ Password field found (form rendered in {timings['form_render']:.2f}s)")
         
-        # Enter credentials (if not dry run)
+        # Enter credentials
         print("📝 Entering credentials...")
+        phase_start = time.perf_counter()
         username_field.send_keys(user_details['email'])
         password_field.send_keys(user_details['pwd'])
+        timings['credential_entry'] = time.perf_counter() - phase_start
         
         # Find submit button
         submit_button = WebDriverWait(driver, 10).until(
@@ -96,67 +134,132 @@ def test_login(website_name, dry_run=True, debug=False):
         )
         print("✅ Submit button found")
         
-        # Submit login
+        # Submit login and wait for the auth cookie or logged-in marker
         current_url = driver.current_url
+        cookies_before = {cookie['name'] for cookie in driver.get_cookies()}
+        submit_mark = driver.execute_script("return performance.now()")
+        phase_start = time.perf_counter()
         submit_button.click()
-        time.sleep(5)
-        
-        # Check if login was successful
-        new_url = driver.current_url
-        if new_url != current_url:
-            print("✅ Login successful - URL changed")
-            
-            # Check for common success indicators
-            success_indicators = [
-                "logout", "profile", "account", "dashboard",
-                "ออกจากระบบ", "โปรไฟล์"
-            ]
-            
-            page_source = driver.page_source.lower()
-            found_indicators = [ind for ind in success_indicators if ind in page_source]
-            
-            if found_indicators:
-                print(f"✅ Login confirmed - Found indicators: {found_indicators}")
-                return True
-            else:
-                print("⚠️ Login may have succeeded but no clear indicators found")
-                return True
-        else:
-            print("❌ Login may have failed - URL unchanged")
-            
-            # Check for error messages
-            error_indicators = [
-                "error", "invalid", "incorrect", "failed",
-                "ผิดพลาด", "ไม่ถูกต้อง"
-            ]
-            
-            page_source = driver.page_source.lower()
-            found_errors = [err for err in error_indicators if err in page_source]
-            
-            if found_errors:
-                print(f"❌ Login failed - Found errors: {found_errors}")
-            
-            return False
+        try:
+            WebDriverWait(driver, 15, poll_frequency=0.1).until(
+                lambda d: is_authenticated(d, config)
+            )
+            authenticated = True
+        except TimeoutException:
+            authenticated = False
+        timings['submit_to_authenticated'] = time.perf_counter() - phase_start
+        
+        # Same-document login leaves the request in Resource Timing
+        if driver.current_url == current_url:
+            timings['login_requests'] = driver.execute_script(LOGIN_RESOURCES_JS, submit_mark)
+            for request in timings['login_requests']:
+                print(f"🌐 Login request {request['name']}: {request['duration']:.0f} ms "
+                      f"(TTFB {request['ttfb']:.0f} ms)")
+        
+        # Candidates for the site's auth_cookies, which are not configured yet
+        if not config.get('auth_cookies'):
+            new_cookies = sorted({cookie['name'] for cookie in driver.get_cookies()} - cookies_before)
+            if new_cookies:
+                print(f"🍪 Cookies set by the login: {', '.join(new_cookies)} "
+                      f"(add the session cookie to auth_cookies in config.py)")
+        
+        if authenticated:
+            print(f"✅ Login confirmed in {timings['submit_to_authenticated']:.2f}s")
+            return True
+        
+        if driver.current_url != current_url:
+            print("⚠️ URL changed but no auth cookie or logged-in marker found")
+            return True
+        
+        print("❌ Login may have failed - URL unchanged")
+        
+        # Check for error messages
+        error_indicators = [
+            "error", "invalid", "incorrect", "failed",
+            "ผิดพลาด", "ไม่ถูกต้อง"
+        ]
+        
+        page_source = driver.page_source.lower()
+        found_errors = [err for err in error_indicators if err in page_source]
+        
+        if found_errors:
+            print(f"❌ Login failed - Found errors: {found_errors}")
         
+        return False
+    
     except Exception as e:
         print(f"❌ Login test failed: {e}")
         return False
-        
+    
     finally:
-        if driver and not debug:
-            driver.quit()
-        elif debug:
-            input("Press Enter to close browser...")
+        if driver and owns_driver:
+            if debug and not exiting_on_signal():
+                flush_logging()
+                input("Press Enter to close browser...")
             driver.quit()
 
 
+def record_login(history, website_name, timings, passed):
+    """Append one login test's phase timings to the run history"""
+    if history:
+        stages = [(phase, timings[phase], None) for phase in PHASES if phase in timings]
+        history.record_run("test_login", website_name, stages, outcome="passed" if passed else "failed")
+
+
+def benchmark_login(website_name, repeats, dry_run=False, base_url=None, history=None):
+    """Repeat the login test on one browser and report phase distributions"""
+    def open_browser():
+        return create_driver(headless=True, page_load_strategy="normal")
+    
+    samples = {phase: [] for phase in PHASES}
+    passed = 0
+    monitor = MemoryMonitor()
+    driver = open_browser()
+    try:
+        for run in range(repeats):
+            print(f"\n🔁 Run {run + 1}/{repeats}")
+            driver = monitor.recycle_if_needed(driver, open_browser)
+            # Start each run logged out
+            driver.delete_all_cookies()
+            timings = {}
+            run_passed = test_login(website_name, dry_run, driver=driver, base_url=base_url, timings=timings)
+            if run_passed:
+                passed += 1
+            record_login(history, website_name, timings, run_passed)
+            for phase in PHASES:
+                if phase in timings:
+                    samples[phase].append(timings[phase])
+    finally:
+        driver.quit()
+    
+    print("\n" + "=" * 50)
+    print("📊 LOGIN TIMING (seconds)")
+    print("=" * 50)
+    for phase in PHASES:
+        stats = summarize(samples[phase])
+        if stats["count"]:
+            print(f"{phase:<25} p50 {stats['p50']:.3f}  p95 {stats['p95']:.3f}  "
+                  f"min {stats['min']:.3f}  max {stats['max']:.3f}")
+    print(f"\n🎯 {passed}/{repeats} runs passed")
+    if monitor.peak_mb:
+        print(f"🧠 Peak browser memory {monitor.peak_mb:.0f} MB, {monitor.recycles} restart(s)")
+    
+    return passed == repeats
+
+
 def main():
     parser = argparse.ArgumentParser(description='Test login functionality')
     parser.add_argument('--website', required=True, help='Website to test')
     parser.add_argument('--dry-run', action='store_true', help='Test without actual login')
     parser.add_argument('--debug', action='store_true', help='Run with browser visible')
+    parser.add_argument('--repeat', type=int, default=1, help='Repeat the login to get timing distributions')
+    parser.add_argument('--base-url', help='URL to use instead of the site (e.g. local mock site)')
+    parser.add_argument('--profile', action='store_true', help='Profile the test and write flamegraph stacks')
+    parser.add_argument('--no-history', action='store_true', help='Do not append timings to run_history.db')
     
     args = parser.parse_args()
+    configure_logging()
+    install_reaper(sigterm=True)
     
     print("🧪 LOGIN FUNCTIONALITY TEST")
     print("=" * 50)
@@ -164,7 +267,20 @@ def main():
     if args.dry_run:
         print("⚠️ DRY RUN MODE: Will not perform actual login")
     
-    success = test_login(args.website, args.dry_run, args.debug)
+    history = None if args.no_history else RunHistory()
+    profiler = StageProfiler() if args.profile else None
+    with profiler.stage("login") if profiler else nullcontext():
+        if args.repeat > 1:
+            success = benchmark_login(args.website, args.repeat, args.dry_run, args.base_url, history)
+        else:
+            timings = {}
+            success = test_login(args.website, args.dry_run, args.debug, base_url=args.base_url, timings=timings)
+            record_login(history, args.website, timings, success)
+    
+    if profiler:
+        profiler.print_summary()
+    if history:
+        history.close()
     
     print("\n" + "=" * 50)
     if success:
@@ -176,4 +292,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -36,10 +36,16 @@ def test_selenium_import():
         return False
 
 
-def test_chrome_driver():
+def test_chrome_driver(driver=None):
     """Test Chrome WebDriver setup"""
     print("\n🌐 Testing Chrome WebDriver...")
     try:
+        if driver:
+            # Reuse a running session instead of paying another cold start
+            user_agent = driver.execute_script("return navigator.userAgent")
+            print(f"✅ Chrome WebDriver - Working (shared session: {user_agent})")
+            return True
+        
         chrome_options = Options()
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
@@ -3,20 +3,56 @@ Multi-Website Ticket Booking Automation
 Supports: Thai Ticket Major, Ticket Melon, Eventpop
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 import json
+import logging
 import sys
-from config import WEBSITES
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from browser import create_driver, resolve_preset
+from browser_memory import install_reaper, exiting_on_signal
+from config import (WEBSITES, PAGE_LOAD_STRATEGY, STAGE_RECOVERY, BROWSER_BACKEND, CHROME_PRESET,
+                    WATCH_MIN_INTERVAL, WATCH_MAX_INTERVAL)
+from diagnostics import DiagnosticRing
+from log_setup import configure_logging, flush_logging, set_stage
+from run_history import RunHistory
+from stage_profiler import StageProfiler
 from website_handlers import ThaiTicketMajorHandler, TicketMelonHandler, EventpopHandler
+from website_handlers.availability_watch import AvailabilityWatch
+
+logger = logging.getLogger(__name__)
+
+# Readiness stage to wait for after restoring each kind of checkpoint
+CHECKPOINT_READY_STAGES = {
+    "setup": "home",
+    "login": "home",
+    "search_concert": "event",
+    "select_show": "zone",
+    "select_zone": "seats"
+}
 
 
 class TicketBookingAutomation:
-    def __init__(self, website_name, user_details_file="userdetail.json"):
+    def __init__(self, website_name, user_details_file="userdetail.json", page_load_strategy=None, start_at=None):
         self.website_name = website_name.lower()
         self.user_details_file = user_details_file
+        # None leaves the choice to the Chrome preset, then PAGE_LOAD_STRATEGY
+        self.page_load_strategy = page_load_strategy
+        self.headless = False  # Set to True for headless mode
+        self.start_at = start_at
         self.driver = None
         self.handler = None
+        self.diagnostics = None
+        self.checkpoints = []
+        self.profiler = None
+        self.record_history = True
+        self.proxy = None
+        self.preset = CHROME_PRESET
+        self.backend = BROWSER_BACKEND
+        self.watch = False
+        self.watch_timeout = None
+        self.stage_timings = []
+        self.outcome = None
         
         # Load user details
         try:
@@ -39,12 +75,9 @@ class TicketBookingAutomation:
         
     def setup_driver(self):
         """Setup Chrome WebDriver"""
-        chrome_options = Options()
-        chrome_options.add_experimental_option("detach", True)
-        # Uncomment the next line for headless mode
-        # chrome_options.add_argument("--headless")
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
+        self.driver = create_driver(headless=self.headless,
+                                    page_load_strategy=self.page_load_strategy, performance_log=True,
+                                    proxy=self.proxy, preset=self.preset)
         
     def get_handler(self):
         """Get the appropriate website handler"""
@@ -56,67 +89,252 @@ class TicketBookingAutomation:
         
         handler_class = handlers.get(self.website_name)
         if handler_class:
-            return handler_class(self.driver, self.config, self.user_details)
+            return handler_class(self.driver, self.config, self.user_details, self.backend)
         else:
             raise ValueError(f"No handler found for {self.website_name}")
             
+    def run_stage(self, stage, func, *args):
+        """Run one handler stage under its recovery policy.
+        
+        Each success records a checkpoint. A failure is retried in place or
+        resumed from the last good checkpoint on the same driver; diagnostics
+        are saved once the policy is exhausted.
+        """
+        policy = STAGE_RECOVERY.get(stage, {})
+        attempts = 1 + policy.get("retries", 0)
+        
+        set_stage(stage)
+        try:
+            for attempt in range(1, attempts + 1):
+                try:
+                    # A restore that fails counts as a failed attempt
+                    if attempt > 1 and policy.get("action") == "resume":
+                        self.restore_checkpoint()
+                    if self.diagnostics:
+                        self.diagnostics.record(stage)
+                    commands_before = self.command_count()
+                    start_time = time.perf_counter()
+                    try:
+                        with self.profiler.stage(stage) if self.profiler else nullcontext():
+                            result = func(*args)
+                    finally:
+                        self.stage_timings.append((stage, time.perf_counter() - start_time,
+                                                   self.command_count() - commands_before))
+                    self.record_checkpoint(stage)
+                    return result
+                except Exception as e:
+                    if attempt == attempts:
+                        self.save_diagnostics(stage, e)
+                        raise
+                    logger.warning(f"⚠️ {stage} failed ({e}), recovery attempt {attempt}/{attempts - 1}")
+                    
+        finally:
+            # Records logged after the stage are not tagged with it
+            set_stage(None)
+            
+    def command_count(self):
+        """WebDriver commands sent so far in this session"""
+        return self.diagnostics.commands.count if self.diagnostics else 0
+        
+    def save_run_history(self):
+        """Append this run's stage timings to the run history store"""
+        if not self.record_history or not self.stage_timings:
+            return
+        seat_map = self.handler.seat_map if self.handler else None
+        try:
+            history = RunHistory()
+            history.record_run("ticket_automation", self.website_name, self.stage_timings,
+                               outcome=self.outcome, commands=self.command_count(),
+                               seat_map_size=len(seat_map.seats) if seat_map else None)
+            history.close()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save run history: {e}")
+            
+    def record_checkpoint(self, stage):
+        """Remember the page and selections after a successful stage"""
+        self.checkpoints.append({
+            "stage": stage,
+            "url": self.driver.current_url,
+            "show": self.handler.current_show,
+            "zone": self.handler.current_zone,
+            "seats": getattr(self.handler, "seat_count", 0),
+            "time": time.time()
+        })
+        
+    def restore_checkpoint(self):
+        """Return the live session to the last good checkpoint"""
+        if not self.checkpoints:
+            return False
+            
+        last = self.checkpoints[-1]
+        logger.info(f"↩️ Resuming from checkpoint after {last['stage']}")
+        self.driver.get(last["url"])
+        self.handler.wait_for_stage(CHECKPOINT_READY_STAGES.get(last["stage"], last["stage"]))
+        
+        # Stages that changed the page without navigating must be replayed
+        first_on_page = len(self.checkpoints) - 1
+        while first_on_page > 0 and self.checkpoints[first_on_page - 1]["url"] == last["url"]:
+            first_on_page -= 1
+        for checkpoint in self.checkpoints[first_on_page + 1:]:
+            if checkpoint["stage"] == "select_show":
+                self.handler.select_show(checkpoint["show"])
+            elif checkpoint["stage"] == "select_zone":
+                self.handler.select_zone(checkpoint["zone"])
+        return True
+        
+    def save_diagnostics(self, stage, error):
+        """Flush the diagnostic ring buffer for a failed stage"""
+        if self.diagnostics:
+            folder = self.diagnostics.flush(stage, error)
+            logger.info(f"🧾 Diagnostics saved to {folder}")
+            
+    def wait_for_sale_start(self):
+        """Hold the warmed-up session until the calibrated start time"""
+        clock = self.handler.clock
+        self.handler.events.pump()
+        if clock.samples:
+            logger.info(f"🕒 Clock offset {clock.offset():+.3f}s (±{clock.uncertainty():.3f}s) "
+                        f"from {clock.samples} page load(s), {clock.rejected} rejected")
+        else:
+            logger.warning("⚠️ No Date header seen, using the local clock")
+            
+        logger.info(f"⏳ Waiting until {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.start_at))}...")
+        clock.wait_until(self.start_at)
+        
+        # Reload the event page so the rounds opened at sale time are shown;
+        # their statuses changed, so the catalog read before is dropped
+        self.driver.refresh()
+        self.handler.catalog_cache.clear()
+        self.handler.wait_for_stage("event")
+        
+    def watch_for_seats(self):
+        """Keep the session open and poll the chosen zone until seats can be selected"""
+        show_index = next((i for i in range(len(self.checkpoints) - 1, -1, -1)
+                           if self.checkpoints[i]["stage"] == "select_show"), None)
+        if show_index is None:
+            return False
+            
+        watch = AvailabilityWatch(self.handler, WATCH_MIN_INTERVAL, WATCH_MAX_INTERVAL)
+        deadline = time.monotonic() + self.watch_timeout if self.watch_timeout else None
+        zone = self.user_details["zone"]
+        logger.info(f"👀 Watching zone {zone} (every {WATCH_MIN_INTERVAL}-{WATCH_MAX_INTERVAL}s)")
+        
+        while True:
+            # Back to the zone page of the chosen show; the watch reads it
+            # from there without another reload
+            del self.checkpoints[show_index + 1:]
+            self.restore_checkpoint()
+            watch.page_fresh = True
+            if not self.handler.can_read_zone_availability():
+                logger.error(f"❌ --watch cannot read zone availability on {self.config['name']}: no availability "
+                             f"reader and no captured zone data, so it would refresh forever. Stopping.")
+                return False
+            
+            remaining = deadline - time.monotonic() if deadline else None
+            if remaining is not None and remaining <= 0:
+                return False
+            if not watch.wait_for_zone(zone, remaining):
+                logger.info("⌛ Watch timed out")
+                return False
+                
+            self.run_stage("select_zone", self.handler.select_zone)
+            if self.run_stage("select_seats", self.handler.select_seats):
+                return True
+            logger.info("Seats were gone before they could be selected, watching again")
+            
     def run_booking_process(self):
         """Run the complete booking process"""
         try:
-            print(f"Starting ticket booking automation for {self.config['name']}...")
+            logger.info(f"Starting ticket booking automation for {self.config['name']}...")
             
             # Setup
             self.setup_driver()
+            self.diagnostics = DiagnosticRing(self.driver, self.website_name)
             self.handler = self.get_handler()
-            self.handler.setup()
+            self.run_stage("setup", self.handler.setup)
             
             # Login
-            print("Logging in...")
-            self.handler.login()
+            logger.info("Logging in...")
+            if not self.run_stage("login", self.handler.login):
+                self.outcome = "login_failed"
+                logger.error("❌ Login failed!")
+                self.save_diagnostics("login", "Login failed")
+                return
             
             # Search for concert
-            print(f"Searching for concert: {self.user_details['concert']}")
-            self.handler.search_concert()
+            logger.info(f"Searching for concert: {self.user_details['concert']}")
+            self.run_stage("search_concert", self.handler.search_concert)
+            
+            # Scheduled mode: everything above ran before the sale opens,
+            # including checking that the chosen show round exists
+            if self.start_at:
+                if self.handler.choose_show() is None:
+                    self.outcome = "show_not_found"
+                    logger.error("❌ Show not found!")
+                    self.save_diagnostics("select_show", "Show not found")
+                    return
+                self.wait_for_sale_start()
             
             # Select show
-            print(f"Selecting show #{self.user_details['show']}")
-            self.handler.select_show()
+            logger.info(f"Selecting show: {self.user_details['show']}")
+            if not self.run_stage("select_show", self.handler.select_show):
+                self.outcome = "show_not_found"
+                logger.error("❌ Show not found!")
+                self.save_diagnostics("select_show", "Show not found")
+                return
             
             # Select zone
-            print(f"Selecting zone: {self.user_details['zone']}")
-            self.handler.select_zone()
+            logger.info(f"Selecting zone: {self.user_details['zone']}")
+            self.run_stage("select_zone", self.handler.select_zone)
             
             # Select seats
-            print(f"Selecting {self.user_details['seats']} seats...")
-            seats_selected = self.handler.select_seats()
+            logger.info(f"Selecting {self.user_details['seats']} seats...")
+            seats_selected = self.run_stage("select_seats", self.handler.select_seats)
             
             if not seats_selected:
-                print("No seats available in preferred zone.")
+                logger.info("No seats available in preferred zone.")
                 
                 # Try alternative zones if handler supports it
                 if hasattr(self.handler, 'find_alternative_zones'):
-                    print("Trying alternative zones...")
-                    if self.handler.find_alternative_zones():
+                    logger.info("Trying alternative zones...")
+                    if self.run_stage("find_alternative_zones", self.handler.find_alternative_zones):
                         seats_selected = True
+                        
+            if not seats_selected and self.watch:
+                seats_selected = self.watch_for_seats()
                     
             if seats_selected:
                 # Confirm booking
-                print("Confirming booking...")
-                success = self.handler.confirm_booking()
+                logger.info("Confirming booking...")
+                success = self.run_stage("confirm_booking", self.handler.confirm_booking)
                 
                 if success:
-                    print("✅ Booking completed successfully!")
+                    self.outcome = "booked"
+                    logger.info("✅ Booking completed successfully!")
                 else:
-                    print("❌ Booking confirmation failed!")
+                    self.outcome = "confirm_failed"
+                    logger.error("❌ Booking confirmation failed!")
+                    self.save_diagnostics("confirm_booking", "Booking confirmation failed")
             else:
-                print("❌ No seats could be selected!")
+                self.outcome = "no_seats"
+                logger.error("❌ No seats could be selected!")
+                self.save_diagnostics("select_seats", "No seats could be selected")
                 
         except Exception as e:
-            print(f"❌ An error occurred: {str(e)}")
+            self.outcome = "error"
+            logger.error(f"❌ An error occurred: {str(e)}")
             
         finally:
+            self.save_run_history()
+            if self.profiler:
+                self.profiler.print_summary()
+                
             # Keep browser open for manual verification
-            input("Press Enter to close the browser...")
+            flush_logging()
+            if not exiting_on_signal():
+                input("Press Enter to close the browser...")
+            if self.handler:
+                self.handler.close()
             if self.driver:
                 self.driver.quit()
 
@@ -131,10 +349,29 @@ def main():
     parser = argparse.ArgumentParser(description='Ticket booking automation')
     parser.add_argument('--dry-run', action='store_true', help='Test mode without actual booking')
     parser.add_argument('--verbose', action='store_true', help='Verbose logging')
+    parser.add_argument('--log-json', action='store_true', help='Write log records as JSON lines')
+    parser.add_argument('--log-file', help='Write log records to a file instead of the terminal')
+    parser.add_argument('--no-history', action='store_true', help='Do not append this run to run_history.db')
+    parser.add_argument('--proxy', help='Send browser traffic through this proxy (e.g. fault_proxy.py)')
+    parser.add_argument('--watch', action='store_true',
+                        help='If the zone is sold out, keep the session open and book when seats appear')
+    parser.add_argument('--watch-minutes', type=float, help='Give up watching after this many minutes')
+    parser.add_argument('--backend', choices=['selenium', 'cdp'],
+                        help=f'Command backend for handlers (default: {BROWSER_BACKEND})')
     parser.add_argument('--timeout', type=int, default=30, help='Timeout in seconds')
     parser.add_argument('--website', help='Website to use')
+    parser.add_argument('--start-at', help='Sale start time "YYYY-MM-DD HH:MM:SS" (local); '
+                        'warm up before it and select the show at that instant')
+    parser.add_argument('--page-load-strategy', choices=['normal', 'eager', 'none'],
+                        help=f'Chrome page load strategy (default: {PAGE_LOAD_STRATEGY})')
+    parser.add_argument('--profile', action='store_true',
+                        help='Write per-stage pstats and collapsed-stack flamegraphs to profiles/')
+    parser.add_argument('--preset', help='Chrome launch preset from config.py or chrome_presets.json '
+                        '(e.g. one saved by launch_benchmark.py)')
     
     args = parser.parse_args()
+    configure_logging(verbose=args.verbose, json_output=args.log_json, log_file=args.log_file)
+    install_reaper(sigterm=True)
     
     # Show supported websites
     print("Supported websites:")
@@ -155,8 +392,32 @@ def main():
     if args.dry_run:
         print("⚠️ DRY RUN MODE: No actual booking will be performed")
     
+    preset = args.preset or CHROME_PRESET
+    try:
+        resolve_preset(preset)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    start_at = None
+    if args.start_at:
+        try:
+            start_at = datetime.fromisoformat(args.start_at).timestamp()
+        except ValueError:
+            print(f"Invalid --start-at '{args.start_at}', expected YYYY-MM-DD HH:MM:SS")
+            sys.exit(1)
+    
     # Run automation
-    automation = TicketBookingAutomation(website)
+    automation = TicketBookingAutomation(website, page_load_strategy=args.page_load_strategy,
+                                         start_at=start_at)
+    if args.profile:
+        automation.profiler = StageProfiler()
+    automation.record_history = not args.no_history
+    automation.proxy = args.proxy
+    automation.preset = preset
+    automation.backend = args.backend or BROWSER_BACKEND
+    automation.watch = args.watch
+    automation.watch_timeout = args.watch_minutes * 60 if args.watch_minutes else None
     
     # Apply test settings
     if hasattr(automation, 'set_test_mode'):
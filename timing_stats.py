@@ -0,0 +1,23 @@
+"""Small helpers for summarising timing samples"""
+
+
+def percentile(samples, pct):
+    """Linear-interpolated percentile of ``samples`` (pct in 0-100)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(samples):
+    """Return count, min, p50, p95 and max for a list of samples"""
+    return {
+        "count": len(samples),
+        "min": min(samples) if samples else None,
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "max": max(samples) if samples else None
+    }
@@ -0,0 +1,143 @@
+"""Polite polling of zone availability for one user's chosen show"""
+
+import json
+import logging
+import random
+import re
+import time
+from email.utils import parsedate_to_datetime
+from .network_capture import ZONE_NAME_KEYS, find_records, is_available
+
+
+logger = logging.getLogger(__name__)
+
+# Re-request the zone availability the page itself loads, with the user's
+# cookies, and hand back the status, caching headers and body
+FETCH_AVAILABILITY_JS = """
+var url = arguments[0];
+var done = arguments[arguments.length - 1];
+fetch(url, {credentials: 'include', cache: 'no-cache'}).then(function (response) {
+    var headers = {};
+    ['retry-after', 'cache-control', 'age', 'expires', 'date'].forEach(function (name) {
+        var value = response.headers.get(name);
+        if (value !== null) {
+            headers[name] = value;
+        }
+    });
+    return response.text().then(function (body) {
+        done({status: response.status, headers: headers, body: body});
+    });
+}).catch(function (error) {
+    done({status: 0, headers: {}, error: String(error)});
+});
+"""
+
+
+def retry_after_seconds(value, now=None):
+    """Seconds requested by a Retry-After header (delta or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - (now or time.time()), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def fresh_for_seconds(headers, now=None):
+    """How long a response stays fresh according to its caching headers"""
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    if match:
+        age = float(headers.get("age", "0") or 0)
+        return max(float(match.group(1)) - age, 0.0)
+    if "expires" in headers:
+        try:
+            return max(parsedate_to_datetime(headers["expires"]).timestamp() - (now or time.time()), 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+    return 0.0
+
+
+class AvailabilityWatch:
+    """Wait for a zone to show availability without hammering the site.
+
+    Polls no faster than ``min_interval``. The interval grows while nothing
+    changes and after errors, up to ``max_interval``. A Retry-After header
+    or a response that is still fresh by its cache headers pushes the next
+    poll further out. When the page's own zone data URL is known, only that
+    is re-requested; otherwise the page is reloaded and read in one call.
+    """
+
+    def __init__(self, handler, min_interval=30.0, max_interval=300.0, backoff=1.5):
+        self.handler = handler
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.polls = 0
+        self.last_zones = None
+        # Set when the caller has just loaded the zone page, so the next
+        # poll reads it instead of reloading it again
+        self.page_fresh = True
+
+    def poll(self):
+        """Fresh zone availability and the server's minimum wait before the next poll"""
+        self.polls += 1
+        url = self.handler.capture.zones_url() if self.handler.capture else None
+        if not url:
+            if self.page_fresh:
+                self.page_fresh = False
+                return self.handler.zone_availability(), 0.0
+            return self.handler.reload_zone_availability(), 0.0
+
+        try:
+            response = self.handler.driver.execute_async_script(FETCH_AVAILABILITY_JS, url)
+        except Exception as e:
+            logger.warning(f"Availability request failed: {e}")
+            return None, 0.0
+        headers = response.get("headers", {})
+        server_wait = max(retry_after_seconds(headers.get("retry-after")) or 0.0, fresh_for_seconds(headers))
+        if response.get("status") != 200:
+            logger.warning(f"Availability request returned {response.get('status') or response.get('error')}")
+            return None, server_wait
+        try:
+            zones = dict(find_records(json.loads(response["body"]), ZONE_NAME_KEYS))
+        except ValueError:
+            return None, server_wait
+        return zones or None, server_wait
+
+    def next_delay(self, zones, server_wait):
+        if zones is None:
+            # Error or unreadable data: back off harder
+            self.interval = min(self.interval * 2, self.max_interval)
+        elif zones == self.last_zones:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        else:
+            self.interval = self.min_interval
+        if zones is not None:
+            self.last_zones = zones
+        # Jitter so a fixed interval never lines up with other clients
+        return max(self.interval, server_wait) * random.uniform(1.0, 1.2)
+
+    def wait_for_zone(self, zone, timeout=None):
+        """Poll until ``zone`` has seats; returns False when ``timeout`` passes"""
+        deadline = time.monotonic() + timeout if timeout else None
+        wanted = zone.strip().lower()
+        while True:
+            zones, server_wait = self.poll()
+            availability = next((value for name, value in (zones or {}).items()
+                                 if name.strip().lower() == wanted), None)
+            if availability is not None and is_available(availability):
+                logger.info(f"🎟️ Zone {zone} shows availability ({availability}) after {self.polls} poll(s)")
+                return True
+
+            delay = self.next_delay(zones, server_wait)
+            if deadline and time.monotonic() + delay > deadline:
+                return False
+            logger.info(f"👀 Zone {zone} not available, checking again in {delay:.0f}s")
+            time.sleep(delay)
@@ -5,30 +5,85 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from time import sleep
 import json
+import logging
+from .cdp_async import CDPBackend, is_supported
+from .cdp_events import CDPEventStream
+from .locators import ALL_PRESENT_JS, ALL_VISIBLE_JS, FILL_FORM_JS, FIRST_OF_JS, as_locators, is_authenticated
+from .network_capture import NetworkCapture, is_available
+from .readiness import PageReadiness
+from .seat_map import DRAIN_JS, SeatMap
+from .server_clock import ServerClock
+from .show_catalog import CLICK_SHOW_JS, EXTRACT_SHOWS_JS, CatalogCache, ShowCatalog
+
+
+logger = logging.getLogger(__name__)
 
 
 class BaseTicketHandler(ABC):
-    def __init__(self, driver, config, user_details):
+    def __init__(self, driver, config, user_details, backend="selenium"):
         self.driver = driver
         self.config = config
         self.user_details = user_details
         self.wait = WebDriverWait(driver, 30)
-        
-    @abstractmethod
-    def login(self):
-        """Login to the website"""
-        pass
-    
+        self.cdp = self.connect_cdp() if backend == "cdp" else None
+        self.events = self.cdp.events if self.cdp else CDPEventStream(driver)
+        self.readiness = PageReadiness(self.events)
+        self.clock = ServerClock(self.events)
+        self.current_show = None
+        self.current_zone = None
+        self.catalog_cache = CatalogCache()
+        self.seat_map = None
+        self.confirm_ready = False
+        self.capture = None
+        if "network_capture" in config:
+            capture_config = config["network_capture"]
+            self.capture = NetworkCapture(driver, self.events, capture_config["zone_patterns"],
+                                          capture_config["seat_patterns"], self.cdp)
+
+    def connect_cdp(self):
+        """Open the asyncio DevTools backend, or None to stay on Selenium"""
+        if not is_supported():
+            logger.warning("websockets is not installed, using the Selenium backend")
+            return None
+        try:
+            return CDPBackend.attach(self.driver)
+        except Exception as e:
+            logger.warning(f"DevTools backend unavailable ({e}), using the Selenium backend")
+            return None
+
+    def close(self):
+        """Release the DevTools backend, if one was opened"""
+        if self.cdp:
+            self.cdp.close()
+            self.cdp = None
+
+    def run_scripts(self, *scripts):
+        """Run independent scripts and return their results in order.
+
+        Each item is a script body or a ``(script, *args)`` tuple. With the
+        CDP backend they are pipelined on one websocket, otherwise they run
+        one after another through Selenium. Results must be plain values,
+        not elements.
+        """
+        calls = [script if isinstance(script, tuple) else (script,) for script in scripts]
+        if self.cdp:
+            results = self.cdp.evaluate_many(calls)
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+            return results
+        return [self.driver.execute_script(script, *args) for script, *args in calls]
+
     @abstractmethod
     def search_concert(self):
         """Search for the specified concert"""
         pass
     
     @abstractmethod
-    def select_show(self):
+    def select_show(self, show=None):
         """Select the show/round"""
         pass
     
@@ -47,10 +102,63 @@ class BaseTicketHandler(ABC):
         """Confirm the booking"""
         pass
     
+    def login(self, timeout=15):
+        """Log in through the site's form; returns whether the session is authenticated.
+
+        Both credentials are typed and the form submitted in one script
+        call that fires the input and change events the site listens for.
+        Success means an auth cookie or the visible logged-in marker
+        appeared within ``timeout``. A site with ``lenient_login`` set, or
+        with neither configured, only gets a warning when that does not
+        happen.
+        """
+        if self.is_logged_in():
+            return True
+            
+        login_selectors = self.config["login_selectors"]
+        field_by = self.config.get("field_locator", "id")
+        username_field = [field_by, login_selectors["username_field"]]
+        password_field = [field_by, login_selectors["password_field"]]
+        
+        self.click_element_safe(By.XPATH, login_selectors["login_button"])
+        try:
+            WebDriverWait(self.driver, 10, poll_frequency=0.1).until(
+                lambda driver: driver.execute_script(ALL_PRESENT_JS, [username_field, password_field])
+            )
+        except TimeoutException:
+            logger.warning("Login form did not appear")
+            return False
+            
+        missing = self.driver.execute_script(
+            FILL_FORM_JS,
+            [username_field + [self.user_details["email"]], password_field + [self.user_details["pwd"]]],
+            ["xpath", login_selectors["submit_button"]]
+        )
+        if missing:
+            logger.warning(f"Login form incomplete, not found: {missing}")
+            return False
+            
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(lambda driver: self.is_logged_in())
+        except TimeoutException:
+            detectable = self.config.get("auth_cookies") or self.config.get("logged_in_marker")
+            if detectable and not self.config.get("lenient_login"):
+                logger.warning(f"No auth cookie or visible logged-in marker after {timeout}s")
+                return False
+            logger.warning(f"⚠️ Login submitted but not confirmed after {timeout}s, continuing")
+            return True
+        logger.info("Logged in")
+        return True
+        
+    def is_logged_in(self):
+        """Whether the auth cookie is set or the logged-in DOM marker is visible"""
+        return is_authenticated(self.driver, self.config)
+        
     def setup(self):
         """Setup the browser and navigate to website"""
         self.driver.maximize_window()
         self.driver.get(self.config["base_url"])
+        self.wait_for_stage("home")
         self.driver.implicitly_wait(30)
     
     def find_element_safe(self, by, value, timeout=10):
@@ -61,9 +169,26 @@ class BaseTicketHandler(ABC):
             )
             return element
         except TimeoutException:
-            print(f"Element not found: {value}")
+            logger.info(f"Element not found: {value}")
             return None
     
+    def find_first_of(self, locators, timeout=10):
+        """Wait for whichever of several locators matches first.
+
+        All alternatives are checked together in one script call per poll,
+        so absent branches cost nothing. Returns ``(index, element)`` of
+        the matching locator, or ``(None, None)`` on timeout.
+        """
+        candidates = as_locators(locators)
+        try:
+            index, element = WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                lambda driver: driver.execute_script(FIRST_OF_JS, candidates)
+            )
+            return index, element
+        except TimeoutException:
+            logger.info(f"None of the elements found: {[value for _, value in candidates]}")
+            return None, None
+    
     def click_element_safe(self, by, value, timeout=10):
         """Safely click element with timeout"""
         try:
@@ -73,15 +198,312 @@ class BaseTicketHandler(ABC):
             element.click()
             return True
         except TimeoutException:
-            print(f"Element not clickable: {value}")
+            logger.info(f"Element not clickable: {value}")
             return False
     
     def wait_for_url_change(self, current_url, timeout=30):
-        """Wait for URL to change from current URL"""
+        """Wait for URL to change from current URL.
+
+        A main-frame navigation event answers without a round-trip; the
+        driver's URL is still checked because history.pushState changes
+        the URL without one.
+        """
+        def url_changed(driver):
+            self.events.pump()
+            if self.events.available:
+                url = self.readiness.main_frame_url
+                if url is not None and url != current_url:
+                    return True
+            return driver.current_url != current_url
+
         try:
-            WebDriverWait(self.driver, timeout).until(
-                lambda driver: driver.current_url != current_url
-            )
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(url_changed)
+            return True
+        except TimeoutException:
+            return False
+
+    def wait_for_stage(self, stage, timeout=30):
+        """Wait until the page is interactive enough for a booking stage.
+
+        A stage is ready as soon as all of its ``ready_selectors`` are
+        present, without waiting for third-party assets. Stages without
+        selectors fall back to the load event or network idle.
+        """
+        locators = as_locators(self.config.get("ready_selectors", {}).get(stage, []))
+
+        def stage_ready(driver):
+            self.events.pump()
+            if locators:
+                return driver.execute_script(ALL_PRESENT_JS, locators)
+            if not self.events.available:
+                return driver.execute_script("return document.readyState") != "loading"
+            return self.readiness.load_fired or self.readiness.network_idle()
+
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(stage_ready)
             return True
         except TimeoutException:
-            return False
\ No newline at end of file
+            logger.warning(f"Stage '{stage}' not ready after {timeout}s")
+            return False
+
+    def show_rows_locator(self):
+        booking_selectors = self.config["booking_selectors"]
+        return ["xpath", booking_selectors.get("show_rows", booking_selectors["show_selector"])]
+
+    def show_catalog(self, refresh=False):
+        """All show rounds of the current event page, cached per event URL"""
+        url = self.driver.current_url
+        catalog = None if refresh else self.catalog_cache.get(url)
+        if catalog is None:
+            rows = self.driver.execute_script(EXTRACT_SHOWS_JS, self.show_rows_locator())
+            catalog = ShowCatalog.from_rows(rows, self.show_locator)
+            if len(catalog):
+                self.catalog_cache.put(url, catalog)
+        return catalog
+
+    def show_locator(self, index):
+        """[by, value] locator that selects the show round at a 1-based position"""
+        show_selector = self.config["booking_selectors"]["show_selector"]
+        if "{show}" in show_selector:
+            return ["xpath", show_selector.format(show=index)]
+        return ["xpath", f"({show_selector})[{index}]"]
+
+    def choose_show(self, show=None):
+        """Catalog entry for a show choice: its position, date or time label.
+
+        A cached catalog without a match is read again from the page before
+        giving up, in case rounds were added since.
+        """
+        if show is None:
+            show = self.user_details["show"]
+        catalog = self.show_catalog()
+        entry = catalog.find(show)
+        if entry is None and catalog.cached:
+            catalog = self.show_catalog(refresh=True)
+            entry = catalog.find(show)
+        if entry is None:
+            logger.warning(f"No show matches '{show}'; rounds on the page: {catalog.labels()}")
+            return None
+        if entry["status"] != "available":
+            logger.warning(f"Show {entry['label']!r} looks sold out, selecting it anyway")
+        logger.info(f"Show #{entry['index']}: {entry['date'] or '-'} {entry['time'] or '-'} {entry['venue'] or ''}")
+        self.current_show = show
+        return entry
+
+    def click_show(self, show=None):
+        """Choose a show round and click it; returns its catalog entry or None.
+
+        The click happens in the same script call that checks the row still
+        reads as the catalog label. If it does not, the rounds changed since
+        they were read, so the catalog is read again and the choice redone.
+        """
+        entry = self.choose_show(show)
+        for attempt in range(2):
+            if entry is None:
+                return None
+            if self.driver.execute_script(CLICK_SHOW_JS, self.show_rows_locator(), entry["index"],
+                                          entry["label"], entry["locator"]):
+                return entry
+            if attempt == 0:
+                logger.info("Show rounds changed since they were read, reading them again")
+                self.catalog_cache.clear()
+                entry = self.choose_show(show)
+        logger.warning(f"Show {entry['label']!r} could not be clicked")
+        return None
+
+    def captured_zones(self):
+        """Zone availability from the page's own XHR responses, or None"""
+        if self.capture is None:
+            return None
+        self.events.pump()
+        return self.capture.zones()
+
+    def zone_availability(self):
+        """Zone availability as {zone name: availability}, or None.
+
+        Uses the page's own captured XHR data when there is any, otherwise
+        the site handler's ``read_zone_availability``.
+        """
+        return self.captured_zones() or self.read_zone_availability()
+
+    def read_zone_availability(self):
+        """Read zone availability from the current page; sites override this"""
+        return None
+
+    def can_read_zone_availability(self):
+        """Whether zone availability can be read from the page or captured data"""
+        if type(self).read_zone_availability is not BaseTicketHandler.read_zone_availability:
+            return True
+        return bool(self.captured_zones())
+
+    def reload_zone_availability(self):
+        """Reload the zone page and read its availability"""
+        self.driver.refresh()
+        self.wait_for_stage("zone")
+        return self.zone_availability()
+
+    def captured_available_seats(self):
+        """Available seat names from the page's own XHR responses, or None"""
+        if self.capture is None:
+            return None
+        self.events.pump()
+        seats = self.capture.seats()
+        if seats is None:
+            return None
+        return [name for name, availability in seats.items() if is_available(availability)]
+
+    def enter_zone(self, zone):
+        """Record the zone being selected and forget the previous zone's seat data"""
+        self.current_zone = zone
+        self.seat_map = None
+        self.confirm_ready = False
+        if self.capture is not None:
+            # Responses already in the event queue belong to the old zone too
+            self.events.pump()
+            self.capture.clear()
+
+    def select_captured_seats(self, seats_needed):
+        """Click seats listed as available in captured XHR data.
+
+        Before the seat map is loaded, only the captured names are looked up
+        in the page (by data-seat-id, title or id), so the container is not
+        scanned; afterwards they are matched against the loaded map. The
+        seats are clicked in one batched script call. Returns the number of
+        seats selected; the caller fills the rest from the seat map.
+        """
+        if seats_needed <= 0 or self.seat_map is None:
+            return 0
+        available = self.captured_available_seats()
+        if not available:
+            return 0
+            
+        if self.seat_map.installed:
+            keys = self.seat_map.match(available)
+        else:
+            keys = self.seat_map.lookup(available)
+        batch = keys[:seats_needed]
+        if not batch:
+            return 0
+        confirmed = self.seat_map.click_batch(batch)
+        for seat_key in confirmed:
+            logger.debug("Selected seat: %s", seat_key)
+                
+        logger.info(f"Selected {len(confirmed)}/{seats_needed} seats from captured seat data")
+        return len(confirmed)
+
+    def start_seat_map(self):
+        """A new seat map for this attempt, without reading the page yet.
+
+        Seats selected or clicked by an earlier attempt in the same zone are
+        carried over, so a retry counts them instead of clicking them again,
+        which would deselect them.
+        """
+        seat_config = self.config["seat_map"]
+        previous = self.seat_map
+        self.seat_map = SeatMap(self.driver, seat_config.get("container"), seat_config["cell"], seat_config["mode"],
+                                seat_config.get("available_class", "available"))
+        if previous is not None:
+            self.seat_map.selected = set(previous.selected)
+            self.seat_map.clicked = set(previous.clicked)
+            if self.seat_map.selected:
+                logger.info(f"{len(self.seat_map.selected)} seats already selected by an earlier attempt")
+        return self.seat_map
+
+    def load_seat_map(self):
+        """Read the whole seat container once and keep it observed for changes.
+
+        Carried-over seats that are no longer on the page are dropped.
+        """
+        seat_map = self.seat_map or self.start_seat_map()
+        if not seat_map.install():
+            logger.warning("Seat container not found")
+            return seat_map
+        seat_map.selected &= set(seat_map.seats)
+        seat_map.clicked &= set(seat_map.seats)
+        logger.info(f"{seat_map.unavailable_count()} seats not available")
+        return seat_map
+
+    def finish_seat_selection(self):
+        """Pick up late seat confirmations and check the confirm button together.
+
+        The last seat-map drain and the confirm button check do not depend
+        on each other, so with the CDP backend they share one round-trip.
+        Sets ``confirm_ready`` for ``confirm_booking`` and returns the
+        number of seats selected.
+        """
+        confirm = self.config["booking_selectors"]["confirm_button"]
+        by = "xpath" if confirm.startswith(("/", "(")) else "partial link text"
+        changes, visible = self.run_scripts(DRAIN_JS, (ALL_VISIBLE_JS, [[by, confirm]]))
+        self.seat_map.apply_drained(changes)
+        self.confirm_ready = bool(visible)
+        return len(self.seat_map.selected)
+
+    def select_seats_from_map(self, seats_needed):
+        """Click available seats from the live seat map.
+
+        Before each click the cells the observer saw change are applied,
+        so a seat someone else took (class or state change) is skipped
+        without clicking it. A click that still fails costs the same
+        incremental refresh, not a rescan.
+        """
+        seat_map = self.seat_map
+        selected = 0
+        taken = 0
+        tried = set()
+        
+        while selected < seats_needed:
+            seat_map.refresh()
+            candidates = [key for key in seat_map.available() if key not in tried]
+            if not candidates:
+                break
+                
+            seat_key = candidates[0]
+            tried.add(seat_key)
+            seat = seat_map.element(seat_key)
+            try:
+                if seat is None:
+                    raise NoSuchElementException(seat_key)
+                seat.click()
+            except WebDriverException:
+                logger.debug("Seat %s was taken, refreshing seat map", seat_key)
+                taken += 1
+                seat_map.refresh()
+                continue
+                
+            seat_map.selected.add(seat_key)
+            selected += 1
+            logger.debug("Selected seat: %s", seat_key)
+                
+        logger.info(f"Selected {selected}/{seats_needed} seats ({taken} taken before the click)")
+        return selected
+
+    def select_seats_batch(self, seats_needed, rounds=3):
+        """Select seats with one in-page script call per round.
+
+        Seats that did not confirm are replaced from an incremental refresh
+        of the seat map, so a full selection usually costs 1-2 round-trips.
+        The count comes from the seat map, which also picks up seats that
+        confirmed after their click timed out.
+        """
+        seat_map = self.seat_map
+        start = len(seat_map.selected)
+        selected = 0
+        tried = set()
+        
+        for _ in range(rounds):
+            candidates = [key for key in seat_map.available() if key not in tried]
+            batch = candidates[:seats_needed - selected]
+            if not batch:
+                break
+                
+            tried.update(batch)
+            for seat_key in seat_map.click_batch(batch):
+                logger.debug("Selected seat: %s", seat_key)
+            selected = len(seat_map.selected) - start
+            
+            if selected >= seats_needed:
+                break
+            seat_map.refresh()
+            
+        logger.info(f"Selected {selected}/{seats_needed} seats in {len(tried)} attempted clicks")
+        return selected
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""Asyncio Chrome DevTools Protocol backend over the browser's own websocket.
+
+Selenium sends every command as a blocking HTTP request to chromedriver.
+This backend opens a second DevTools connection to the same page, so
+independent commands are pipelined on one websocket and events arrive
+pushed instead of being polled from the performance log. It needs the
+optional ``websockets`` package; without it handlers stay on Selenium.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import urllib.request
+from collections import deque
+
+try:
+    import websockets
+except ImportError:  # Optional dependency
+    websockets = None
+
+
+def is_supported():
+    """Whether the websocket client library is installed"""
+    return websockets is not None
+
+
+class CDPError(Exception):
+    """A DevTools command returned an error or the script threw"""
+
+
+def page_websocket_url(debugger_address, target_id=None):
+    """DevTools websocket URL of a page, preferring the given target id"""
+    with urllib.request.urlopen(f"http://{debugger_address}/json", timeout=5) as response:
+        targets = [target for target in json.load(response) if target.get("type") == "page"]
+    if not targets:
+        raise CDPError(f"No page target at {debugger_address}")
+    # chromedriver window handles are the DevTools target ids
+    target = next((target for target in targets if target["id"] == target_id), targets[0])
+    return target["webSocketDebuggerUrl"]
+
+
+def script_expression(script, args):
+    """Wrap a Selenium-style script body so ``arguments`` and ``return`` work"""
+    return f"(function() {{\n{script}\n}}).apply(null, {json.dumps(list(args))})"
+
+
+async def gather(coroutines):
+    """Await coroutines together, returning exceptions in place of results"""
+    return await asyncio.gather(*coroutines, return_exceptions=True)
+
+
+class AsyncCDPSession:
+    """One websocket to a page target.
+
+    Commands are written as soon as they are issued and matched to their
+    replies by id, so awaiting several with ``asyncio.gather`` costs about
+    one round-trip instead of one per command.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.websocket = None
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.listeners = []
+        self.reader = None
+
+    async def connect(self):
+        self.websocket = await websockets.connect(self.url, max_size=None)
+        self.reader = asyncio.get_running_loop().create_task(self._read())
+
+    async def _read(self):
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self.pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(message["error"].get("message", "CDP error")))
+                    else:
+                        future.set_result(message.get("result", {}))
+                elif "method" in message:
+                    for listener in self.listeners:
+                        listener(message["method"], message.get("params", {}))
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("DevTools websocket closed"))
+            self.pending.clear()
+
+    async def send(self, method, params=None):
+        """Issue one command and wait for its result"""
+        command_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[command_id] = future
+        await self.websocket.send(json.dumps({"id": command_id, "method": method, "params": params or {}}))
+        return await future
+
+    async def evaluate(self, script, *args):
+        """Run a script body in the page; the result must be JSON-serialisable"""
+        result = await self.send("Runtime.evaluate", {
+            "expression": script_expression(script, args),
+            "returnByValue": True,
+            "awaitPromise": True
+        })
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CDPError(details.get("exception", {}).get("description") or details.get("text"))
+        return result.get("result", {}).get("value")
+
+    async def close(self):
+        if self.websocket is not None:
+            await self.websocket.close()
+        if self.reader is not None:
+            await asyncio.gather(self.reader, return_exceptions=True)
+
+
+class PushedEvents:
+    """Drop-in for ``CDPEventStream`` fed by websocket events.
+
+    Events are queued by the backend thread and dispatched on ``pump()``, so
+    listeners still run on the handler's thread; pumping costs no request.
+    """
+
+    def __init__(self):
+        self.listeners = []
+        self.available = True
+        self.queue = deque()
+
+    def subscribe(self, listener):
+        """Register a ``listener(method, params)`` callback"""
+        self.listeners.append(listener)
+
+    def push(self, method, params):
+        self.queue.append((method, params))
+
+    def pump(self):
+        """Dispatch events received since the last call"""
+        count = 0
+        while self.queue:
+            method, params = self.queue.popleft()
+            count += 1
+            for listener in self.listeners:
+                listener(method, params)
+        return count
+
+
+class CDPBackend:
+    """Synchronous facade: an ``AsyncCDPSession`` on a background event loop"""
+
+    def __init__(self, websocket_url, timeout=30):
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+        self.session = AsyncCDPSession(websocket_url)
+        self.events = PushedEvents()
+        self.session.listeners.append(self.events.push)
+        self.run(self.session.connect())
+        # This connection needs its own Network domain for events and bodies
+        self.send_many([("Network.enable", {}), ("Page.enable", {})])
+
+    @classmethod
+    def attach(cls, driver):
+        """Connect to the page a Selenium Chrome session is driving"""
+        address = driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+        if not address:
+            raise CDPError("Session does not expose a DevTools debugger address")
+        return cls(page_websocket_url(address, driver.current_window_handle))
+
+    def run(self, coroutine):
+        """Run a coroutine on the backend loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(self.timeout)
+
+    def send(self, method, params=None):
+        return self.run(self.session.send(method, params))
+
+    def send_many(self, commands):
+        """Issue ``(method, params)`` commands together.
+
+        Returns results in order; a failed command yields its exception
+        instead of raising.
+        """
+        return self.run(gather([self.session.send(method, params) for method, params in commands]))
+
+    def evaluate_many(self, scripts):
+        """Run ``(script, *args)`` tuples together; exceptions are returned in place"""
+        return self.run(gather([self.session.evaluate(script, *args) for script, *args in scripts]))
+
+    def close(self):
+        try:
+            self.run(self.session.close())
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
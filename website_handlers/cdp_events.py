@@ -0,0 +1,43 @@
+"""Chrome DevTools Protocol events read from the performance log"""
+
+import json
+
+
+class CDPEventStream:
+    """Drain Chrome's performance log and dispatch CDP events to listeners.
+
+    Chrome only records the log when the session was started with the
+    ``goog:loggingPrefs`` capability (see ``setup_driver``). Entries are
+    consumed on read, so every consumer must subscribe here instead of
+    calling ``driver.get_log`` itself.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.listeners = []
+        self.available = True
+
+    def subscribe(self, listener):
+        """Register a ``listener(method, params)`` callback"""
+        self.listeners.append(listener)
+
+    def pump(self):
+        """Read pending events and hand them to every listener"""
+        if not self.available:
+            return 0
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            # Performance logging was not enabled for this session
+            self.available = False
+            return 0
+
+        for entry in entries:
+            message = json.loads(entry["message"]).get("message", {})
+            method = message.get("method")
+            if not method:
+                continue
+            params = message.get("params", {})
+            for listener in self.listeners:
+                listener(method, params)
+        return len(entries)
@@ -1,74 +1,57 @@
 """Handler for Eventpop website"""
 
+import logging
 from selenium.webdriver.common.by import By
 from .base_handler import BaseTicketHandler
 from time import sleep
 
 
+logger = logging.getLogger(__name__)
+
+
 class EventpopHandler(BaseTicketHandler):
-    def __init__(self, driver, config, user_details):
-        super().__init__(driver, config, user_details)
+    def __init__(self, driver, config, user_details, backend="selenium"):
+        super().__init__(driver, config, user_details, backend)
         self.seat_count = 0
         
-    def login(self):
-        """Login to Eventpop"""
-        login_selectors = self.config["login_selectors"]
-        
-        # Click login button
-        self.click_element_safe(By.XPATH, login_selectors["login_button"])
-        sleep(1)
-        
-        # Enter credentials
-        username = self.find_element_safe(By.NAME, login_selectors["username_field"])
-        if username:
-            username.send_keys(self.user_details["email"])
-            
-        password = self.find_element_safe(By.NAME, login_selectors["password_field"])
-        if password:
-            password.send_keys(self.user_details["pwd"])
-            
-        # Submit login
-        self.click_element_safe(By.XPATH, login_selectors["submit_button"])
-        sleep(2)
-        
     def search_concert(self):
         """Search for concert on Eventpop"""
         concert_name = self.user_details["concert"]
         
-        # Search for event
+        # Search for event, or use a direct link if the page already lists it
         try:
-            search_box = self.find_element_safe(By.NAME, "q")
-            if search_box:
-                search_box.send_keys(concert_name)
-                search_box.submit()
-                sleep(2)
+            branch, element = self.find_first_of([
+                (By.NAME, "q"),
+                (By.PARTIAL_LINK_TEXT, concert_name)
+            ])
+            if branch == 0:
+                element.send_keys(concert_name)
+                element.submit()
                 
                 # Click on the event
-                event_link = self.driver.find_element(By.PARTIAL_LINK_TEXT, concert_name)
+                event_link = self.find_element_safe(By.PARTIAL_LINK_TEXT, concert_name)
                 event_link.click()
-            else:
+            elif branch == 1:
                 # Direct link search
-                concert_link = self.driver.find_element(By.PARTIAL_LINK_TEXT, concert_name)
-                concert_link.click()
+                element.click()
+            else:
+                logger.warning(f"Concert '{concert_name}' not found on Eventpop")
         except:
-            print(f"Concert '{concert_name}' not found on Eventpop")
+            logger.warning(f"Concert '{concert_name}' not found on Eventpop")
             
-    def select_show(self):
+    def select_show(self, show=None):
         """Select show on Eventpop"""
-        show_num = int(self.user_details["show"])
-        booking_selectors = self.config["booking_selectors"]
-        
-        # Find event sessions
-        sessions = self.driver.find_elements(By.XPATH, booking_selectors["show_selector"])
-        
-        if show_num <= len(sessions) and show_num > 0:
-            sessions[show_num - 1].click()
-            sleep(2)
+        entry = self.click_show(show)
+        if entry is None:
+            return False
+        self.wait_for_stage("zone")
+        return True
             
     def select_zone(self, zone=None):
         """Select ticket type/zone on Eventpop"""
         if zone is None:
             zone = self.user_details["zone"]
+        self.enter_zone(zone)
             
         booking_selectors = self.config["booking_selectors"]
         
@@ -86,25 +69,27 @@ class EventpopHandler(BaseTicketHandler):
         seats_needed = int(self.user_details["seats"])
         self.seat_count = 0
         
+        booking_selectors = self.config["booking_selectors"]
+        
         # For Eventpop, usually quantity selection rather than individual seats
-        quantity_input = self.find_element_safe(By.NAME, "quantity")
-        if quantity_input:
+        branch, quantity_input = self.find_first_of([
+            (By.NAME, "quantity"),
+            (By.XPATH, booking_selectors["seat_selector"])
+        ])
+        if branch == 0:
             quantity_input.clear()
             quantity_input.send_keys(str(seats_needed))
             self.seat_count = seats_needed
-        else:
-            # If seat selection is available
-            booking_selectors = self.config["booking_selectors"]
-            seats = self.driver.find_elements(By.XPATH, booking_selectors["seat_selector"])
-            
-            for seat in seats:
-                if "available" in seat.get_attribute("class").lower() and self.seat_count < seats_needed:
-                    seat.click()
-                    self.seat_count += 1
-                    sleep(0.5)
-                    
-                    if self.seat_count == seats_needed:
-                        break
+        elif branch == 1:
+            # If seat selection is available, prefer seats the page's own
+            # seat data lists, looked up by name; read the grid only if
+            # more are needed
+            seat_map = self.start_seat_map()
+            self.select_captured_seats(seats_needed - len(seat_map.selected))
+            if len(seat_map.selected) < seats_needed:
+                self.load_seat_map()
+                self.select_seats_batch(seats_needed - len(seat_map.selected))
+            self.seat_count = self.finish_seat_selection()
                         
         return self.seat_count > 0
         
@@ -113,10 +98,13 @@ class EventpopHandler(BaseTicketHandler):
         if self.seat_count > 0:
             booking_selectors = self.config["booking_selectors"]
             
-            # Click booking button
-            self.click_element_safe(By.XPATH, booking_selectors["confirm_button"])
+            # Click booking button; no wait when seat selection already saw it
+            if self.confirm_ready:
+                self.driver.find_element(By.XPATH, booking_selectors["confirm_button"]).click()
+            else:
+                self.click_element_safe(By.XPATH, booking_selectors["confirm_button"])
             sleep(3)
             
-            print("Eventpop booking confirmed!")
+            logger.info("Eventpop booking confirmed!")
             return True
         return False
\ No newline at end of file
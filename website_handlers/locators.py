@@ -0,0 +1,174 @@
+"""In-page locator evaluation shared by the handlers and tools"""
+
+# JavaScript helper that resolves a Selenium (by, value) locator inside the
+# page. Prepend it to a script to evaluate many locators in one round-trip.
+LOCATE_JS = """
+function locateAll(by, value) {
+    var found = [];
+    if (by === 'xpath') {
+        var result = document.evaluate(value, document, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < result.snapshotLength; i++) {
+            found.push(result.snapshotItem(i));
+        }
+        return found;
+    }
+    if (by === 'link text' || by === 'partial link text') {
+        var links = document.getElementsByTagName('a');
+        for (var j = 0; j < links.length; j++) {
+            var text = (links[j].innerText || '').trim();
+            if (by === 'link text' ? text === value : text.indexOf(value) !== -1) {
+                found.push(links[j]);
+            }
+        }
+        return found;
+    }
+    var css = value;
+    if (by === 'id') {
+        css = '[id="' + CSS.escape(value) + '"]';
+    } else if (by === 'name') {
+        css = '[name="' + CSS.escape(value) + '"]';
+    } else if (by === 'class name') {
+        css = '.' + CSS.escape(value);
+    } else if (by === 'tag name') {
+        css = value;
+    }
+    return Array.prototype.slice.call(document.querySelectorAll(css));
+}
+function isVisible(element) {
+    return !!(element.offsetWidth || element.offsetHeight ||
+        element.getClientRects().length);
+}
+"""
+
+# Returns one boolean per locator, telling whether it currently matches
+ALL_PRESENT_JS = LOCATE_JS + """
+var locators = arguments[0];
+for (var i = 0; i < locators.length; i++) {
+    if (locateAll(locators[i][0], locators[i][1]).length === 0) {
+        return false;
+    }
+}
+return true;
+"""
+
+# Returns true when every locator matches at least one visible element
+ALL_VISIBLE_JS = LOCATE_JS + """
+var locators = arguments[0];
+for (var i = 0; i < locators.length; i++) {
+    if (!locateAll(locators[i][0], locators[i][1]).some(isVisible)) {
+        return false;
+    }
+}
+return true;
+"""
+
+# Returns [index, element] for the first locator with a match, or null
+FIRST_OF_JS = LOCATE_JS + """
+var locators = arguments[0];
+for (var i = 0; i < locators.length; i++) {
+    var found = locateAll(locators[i][0], locators[i][1]);
+    if (found.length > 0) {
+        return [i, found[0]];
+    }
+}
+return null;
+"""
+
+# Returns match count, visible count and evaluation time for each
+# [name, by, value] selector, all from a single script call
+HEALTH_JS = LOCATE_JS + """
+var selectors = arguments[0];
+var report = [];
+for (var i = 0; i < selectors.length; i++) {
+    var entry = {name: selectors[i][0], by: selectors[i][1], value: selectors[i][2]};
+    var started = performance.now();
+    try {
+        var found = locateAll(selectors[i][1], selectors[i][2]);
+        entry.ms = performance.now() - started;
+        entry.count = found.length;
+        entry.visible = found.filter(isVisible).length;
+    } catch (error) {
+        entry.ms = performance.now() - started;
+        entry.count = 0;
+        entry.visible = 0;
+        entry.error = String(error);
+    }
+    report.push(entry);
+}
+return report;
+"""
+
+# Types [by, value, text] into each field the way a user would be seen by the
+# page: the native value setter (so framework-managed inputs notice), then
+# input and change events. Clicks the [by, value] submit element if given.
+# Returns the locators that matched nothing; nothing is submitted then.
+FILL_FORM_JS = LOCATE_JS + """
+var fields = arguments[0];
+var submit = arguments[1];
+var missing = [];
+var targets = fields.map(function (field) {
+    var element = locateAll(field[0], field[1])[0];
+    if (!element) {
+        missing.push(field[1]);
+    }
+    return element;
+});
+if (missing.length) {
+    return missing;
+}
+targets.forEach(function (element, i) {
+    var prototype = Object.getPrototypeOf(element);
+    var setter = Object.getOwnPropertyDescriptor(prototype, 'value').set;
+    element.focus();
+    setter.call(element, fields[i][2]);
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+    element.blur();
+});
+if (submit) {
+    var button = locateAll(submit[0], submit[1])[0];
+    if (!button) {
+        return [submit[1]];
+    }
+    button.click();
+}
+return [];
+"""
+
+
+def as_locators(locators):
+    """Normalise locators to JSON-friendly [by, value] pairs"""
+    return [[by, value] for by, value in locators]
+
+
+def is_authenticated(driver, site_config):
+    """Whether one of the site's auth cookies is set or its logged-in marker is visible"""
+    cookie_names = site_config.get("auth_cookies", [])
+    if cookie_names and any(cookie["name"] in cookie_names for cookie in driver.get_cookies()):
+        return True
+    marker = site_config.get("logged_in_marker")
+    if marker:
+        return bool(driver.execute_script(ALL_VISIBLE_JS, [["xpath", marker]]))
+    return False
+
+
+def config_locators(site_config, groups=("login_selectors", "booking_selectors")):
+    """Yield (group, name, by, value) for every configured selector.
+
+    Login fields use the site's ``field_locator``; other values are XPath
+    when they start with "/" or "(" and link text otherwise. Placeholders
+    such as "partial_link_text" are skipped and the show template is
+    filled with the first show.
+    """
+    for group in groups:
+        for name, value in site_config.get(group, {}).items():
+            if value == "partial_link_text":
+                continue
+            if name in ("username_field", "password_field"):
+                by = site_config.get("field_locator", "id")
+            elif value.startswith(("/", "(")):
+                by = "xpath"
+            else:
+                by = "partial link text"
+            yield group, name, by, value.replace("{show}", "1")
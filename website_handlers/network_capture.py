@@ -0,0 +1,129 @@
+"""Passive capture of seat and zone data the page loads over XHR/fetch"""
+
+import json
+import re
+
+# Keys commonly used by seat map APIs, checked in order
+ZONE_NAME_KEYS = ("zone", "zone_name", "zoneName", "zone_code", "zoneCode")
+SEAT_NAME_KEYS = ("seat", "seat_id", "seatId", "seat_name", "seatName", "title")
+AVAILABILITY_KEYS = ("available", "availability", "seats_available", "remain", "remaining", "status")
+AVAILABLE_STATUSES = ("available", "free", "open", "a")
+
+
+def is_available(value):
+    """Interpret an availability field as a boolean"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value > 0
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text.isdigit():
+            return int(text) > 0
+        return text in AVAILABLE_STATUSES
+    return False
+
+
+def find_records(data, name_keys):
+    """Yield (name, availability) for every dict in ``data`` that has both"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            name = next((node[key] for key in name_keys if key in node), None)
+            availability = next((node[key] for key in AVAILABILITY_KEYS if key in node), None)
+            if name is not None and availability is not None:
+                yield str(name), availability
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+class NetworkCapture:
+    """Record JSON responses the page requests on its own.
+
+    Bodies are read from the browser's own buffer with
+    ``Network.getResponseBody``, so no extra request ever reaches the site.
+    With a ``CDPBackend`` all pending bodies are requested together.
+    Zones are only read from responses whose URL matches ``zone_patterns``
+    and seats from those matching ``seat_patterns``.
+    """
+
+    def __init__(self, driver, events, zone_patterns, seat_patterns, cdp=None):
+        self.driver = driver
+        self.cdp = cdp
+        self.zone_patterns = [re.compile(pattern) for pattern in zone_patterns]
+        self.seat_patterns = [re.compile(pattern) for pattern in seat_patterns]
+        self.url_patterns = self.zone_patterns + self.seat_patterns
+        self.pending = {}
+        self.finished = []
+        self.responses = []
+        events.subscribe(self.on_event)
+
+    def on_event(self, method, params):
+        """Remember matching XHR/fetch responses until they finish loading"""
+        if method == "Network.responseReceived":
+            response = params.get("response", {})
+            if params.get("type") not in ("XHR", "Fetch"):
+                return
+            if "json" not in response.get("mimeType", ""):
+                return
+            url = response.get("url", "")
+            if any(pattern.search(url) for pattern in self.url_patterns):
+                self.pending[params["requestId"]] = url
+        elif method == "Network.loadingFinished":
+            request_id = params.get("requestId")
+            if request_id in self.pending:
+                self.finished.append((request_id, self.pending.pop(request_id)))
+
+    def collect(self):
+        """Read bodies of responses that finished since the last call"""
+        if self.cdp:
+            finished, self.finished = self.finished, []
+            results = self.cdp.send_many([("Network.getResponseBody", {"requestId": request_id})
+                                          for request_id, _ in finished])
+            for (_, url), result in zip(finished, results):
+                try:
+                    self.responses.append((url, json.loads(result.get("body", ""))))
+                except (AttributeError, ValueError):
+                    # Failed command (returned as an exception) or not valid JSON
+                    continue
+            return self.responses
+
+        while self.finished:
+            request_id, url = self.finished.pop(0)
+            try:
+                result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                self.responses.append((url, json.loads(result.get("body", ""))))
+            except Exception:
+                # Body evicted from the buffer or not valid JSON
+                continue
+        return self.responses
+
+    def clear(self):
+        """Forget every response seen so far, e.g. when leaving a zone"""
+        self.pending.clear()
+        self.finished = []
+        self.responses = []
+
+    def zones(self):
+        """Latest zone availability as {zone name: availability}, or None"""
+        return self._latest(ZONE_NAME_KEYS, self.zone_patterns)[1]
+
+    def zones_url(self):
+        """URL the page loaded its zone availability from, or None"""
+        return self._latest(ZONE_NAME_KEYS, self.zone_patterns)[0]
+
+    def seats(self):
+        """Latest seat availability as {seat name: availability}, or None"""
+        return self._latest(SEAT_NAME_KEYS, self.seat_patterns)[1]
+
+    def _latest(self, name_keys, patterns):
+        self.collect()
+        for url, data in reversed(self.responses):
+            if not any(pattern.search(url) for pattern in patterns):
+                continue
+            records = dict(find_records(data, name_keys))
+            if records:
+                return url, records
+        return None, None
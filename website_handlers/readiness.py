@@ -0,0 +1,43 @@
+"""Page readiness tracking fed by CDP network and page events"""
+
+import time
+
+
+class PageReadiness:
+    """Track navigation, load events and in-flight requests for the page"""
+
+    def __init__(self, events):
+        self.inflight = set()
+        self.load_fired = False
+        self.dom_content_fired = False
+        self.main_frame_url = None
+        self.last_activity = time.monotonic()
+        events.subscribe(self.on_event)
+
+    def on_event(self, method, params):
+        """Update the page state from a single CDP event"""
+        if method == "Network.requestWillBeSent":
+            if params.get("type") == "Document" and params.get("requestId") == params.get("loaderId"):
+                # A new main document resets the load state
+                self.load_fired = False
+                self.dom_content_fired = False
+                self.inflight.clear()
+            self.inflight.add(params.get("requestId"))
+            self.last_activity = time.monotonic()
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            self.inflight.discard(params.get("requestId"))
+            self.last_activity = time.monotonic()
+        elif method == "Page.domContentEventFired":
+            self.dom_content_fired = True
+        elif method == "Page.loadEventFired":
+            self.load_fired = True
+        elif method == "Page.frameNavigated":
+            frame = params.get("frame", {})
+            if not frame.get("parentId"):
+                self.main_frame_url = frame.get("url")
+
+    def network_idle(self, quiet_time=0.5, max_inflight=2):
+        """True once at most ``max_inflight`` requests stayed open for ``quiet_time``"""
+        if len(self.inflight) > max_inflight:
+            return False
+        return time.monotonic() - self.last_activity >= quiet_time
@@ -0,0 +1,329 @@
+"""Local seat model kept in sync by an in-page MutationObserver"""
+
+# State of one seat cell. ``mode`` "text": a cell with text is a seat;
+# "class": a cell with the class token ``availableClass`` is free.
+STATE_OF_JS = """
+function stateOf(cell, key, mode, availableClass) {
+    var text = (cell.textContent || '').replace(/\\u00a0/g, ' ').trim();
+    var cls = cell.getAttribute('class') || '';
+    // Taken by someone else while we watch: the page marks it on the cell
+    var taken = !!(cell.disabled || cell.getAttribute('aria-disabled') === 'true' ||
+        /(^|[\\s_-])(sold|taken|booked|reserved|unavailable)/i.test(cls));
+    // Picked in this session: pressed, checked or marked selected
+    var selected = cell.getAttribute('aria-pressed') === 'true' ||
+        cell.getAttribute('aria-selected') === 'true' || cell.checked === true ||
+        /(^|\\s)(selected|active|chosen)(\\s|$)/i.test(cls);
+    var free = mode === 'class' ? cell.classList.contains(availableClass) : text !== '';
+    // Every name the seat goes by, for matching names from captured seat data
+    var names = [cell.getAttribute('title'), cell.getAttribute('data-seat-id'), cell.id, text]
+        .filter(function (name) { return name; });
+    return {key: key, text: text, cls: cls, names: names, available: free && !taken && !selected,
+            taken: taken, selected: selected};
+}
+"""
+
+# arguments: container xpath (null: the closest element holding every seat
+# cell), cell CSS selector, availability mode, available class
+INSTALL_JS = STATE_OF_JS + """
+var cellCss = arguments[1];
+var mode = arguments[2];
+var availableClass = arguments[3];
+var container = null;
+if (arguments[0]) {
+    container = document.evaluate(arguments[0], document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+} else {
+    var all = document.querySelectorAll(cellCss);
+    container = all.length ? all[0].parentElement : null;
+    for (var c = 1; c < all.length && container; c++) {
+        while (container && !container.contains(all[c])) {
+            container = container.parentElement;
+        }
+    }
+}
+if (!container) {
+    return null;
+}
+if (window.__seatMap) {
+    window.__seatMap.observer.disconnect();
+}
+
+var map = {container: container, keys: new Map(), cells: {}, changed: new Set(), stale: false,
+           stateOf: function (cell, key) { return stateOf(cell, key, mode, availableClass); }};
+var cells = container.querySelectorAll(cellCss);
+var snapshot = [];
+for (var i = 0; i < cells.length; i++) {
+    var cell = cells[i];
+    var key = cell.getAttribute('title') || cell.getAttribute('data-seat-id') ||
+        cell.id || String(i);
+    map.keys.set(cell, key);
+    map.cells[key] = cell;
+    snapshot.push(map.stateOf(cell, key));
+}
+
+// Spinners, tooltips and the like come and go without touching seat cells
+function touchesSeats(mutation) {
+    var nodes = Array.prototype.slice.call(mutation.addedNodes)
+        .concat(Array.prototype.slice.call(mutation.removedNodes));
+    return nodes.some(function (node) {
+        return node.nodeType === 1 && (node.matches(cellCss) || node.querySelector(cellCss) !== null);
+    });
+}
+
+map.observer = new MutationObserver(function (mutations) {
+    mutations.forEach(function (mutation) {
+        var node = mutation.target.nodeType === 1 ? mutation.target : mutation.target.parentElement;
+        var cell = node && node.closest(cellCss);
+        if (cell && map.keys.has(cell)) {
+            map.changed.add(cell);
+        } else if (mutation.type === 'childList' && touchesSeats(mutation)) {
+            // Rows were rebuilt, the caller has to install again
+            map.stale = true;
+        }
+    });
+});
+map.observer.observe(container, {subtree: true, childList: true, characterData: true,
+    attributes: true, attributeFilter: ['class', 'title', 'disabled', 'aria-disabled']});
+window.__seatMap = map;
+return snapshot;
+"""
+
+# arguments: cell CSS selector, seat names, availability mode, available
+# class. Finds only the named cells (by data-seat-id, title or id) and
+# observes just those, for when captured seat data lists the free seats.
+LOOKUP_JS = STATE_OF_JS + """
+var cellCss = arguments[0];
+var mode = arguments[2];
+var availableClass = arguments[3];
+if (window.__seatMap) {
+    window.__seatMap.observer.disconnect();
+}
+
+function find(name) {
+    var quoted = '"' + CSS.escape(name) + '"';
+    var found = Array.prototype.slice.call(
+        document.querySelectorAll('[data-seat-id=' + quoted + '], [title=' + quoted + ']'));
+    var byId = document.getElementById(name);
+    if (byId) {
+        found.push(byId);
+    }
+    return found.filter(function (cell) { return cell.matches(cellCss); })[0] || null;
+}
+
+var map = {container: document.documentElement, keys: new Map(), cells: {}, changed: new Set(), stale: false,
+           stateOf: function (cell, key) { return stateOf(cell, key, mode, availableClass); }};
+map.observer = new MutationObserver(function (mutations) {
+    mutations.forEach(function (mutation) {
+        var node = mutation.target.nodeType === 1 ? mutation.target : mutation.target.parentElement;
+        var cell = node && node.closest(cellCss);
+        if (cell && map.keys.has(cell)) {
+            map.changed.add(cell);
+        }
+    });
+});
+var states = [];
+arguments[1].forEach(function (name) {
+    var cell = find(String(name));
+    if (!cell || map.keys.has(cell)) {
+        return;
+    }
+    var key = cell.getAttribute('title') || cell.getAttribute('data-seat-id') || cell.id;
+    map.keys.set(cell, key);
+    map.cells[key] = cell;
+    map.observer.observe(cell, {subtree: true, childList: true, characterData: true,
+        attributes: true, attributeFilter: ['class', 'title', 'disabled', 'aria-disabled']});
+    states.push(map.stateOf(cell, key));
+});
+window.__seatMap = map;
+return states;
+"""
+
+DRAIN_JS = """
+var map = window.__seatMap;
+if (!map || map.stale || !document.contains(map.container)) {
+    return null;
+}
+var changes = [];
+map.changed.forEach(function (cell) {
+    changes.push(map.stateOf(cell, map.keys.get(cell)));
+});
+map.changed.clear();
+return changes;
+"""
+
+# arguments: seat keys, per-seat timeout in ms, async callback
+CLICK_BATCH_JS = """
+var keys = arguments[0];
+var timeout = arguments[1];
+var done = arguments[arguments.length - 1];
+var map = window.__seatMap;
+var results = [];
+
+function signature(cell) {
+    return [cell.getAttribute('class'), cell.textContent, cell.getAttribute('aria-pressed'),
+            cell.getAttribute('aria-selected')].join('|');
+}
+
+function press(cell) {
+    var box = cell.getBoundingClientRect();
+    var init = {bubbles: true, cancelable: true, view: window, button: 0,
+                clientX: box.left + box.width / 2, clientY: box.top + box.height / 2};
+    cell.dispatchEvent(new PointerEvent('pointerdown', init));
+    cell.dispatchEvent(new MouseEvent('mousedown', init));
+    cell.dispatchEvent(new PointerEvent('pointerup', init));
+    cell.dispatchEvent(new MouseEvent('mouseup', init));
+    cell.dispatchEvent(new MouseEvent('click', init));
+}
+
+function next(index) {
+    if (index >= keys.length) {
+        done(results);
+        return;
+    }
+    var cell = map && map.cells[keys[index]];
+    if (!cell || !document.contains(cell)) {
+        results.push({key: keys[index], confirmed: false});
+        next(index + 1);
+        return;
+    }
+    // Only changes after the click may later count as a late confirmation
+    map.changed.delete(cell);
+    var before = signature(cell);
+    var started = performance.now();
+    cell.scrollIntoView({block: 'center'});
+    press(cell);
+    (function check() {
+        if (signature(cell) !== before) {
+            results.push({key: keys[index], confirmed: true, cls: cell.getAttribute('class')});
+            next(index + 1);
+        } else if (performance.now() - started > timeout) {
+            results.push({key: keys[index], confirmed: false});
+            next(index + 1);
+        } else {
+            setTimeout(check, 20);
+        }
+    })();
+}
+next(0);
+"""
+
+ELEMENT_JS = "return window.__seatMap ? window.__seatMap.cells[arguments[0]] || null : null;"
+
+
+class SeatMap:
+    """Seat states for one seat container, updated incrementally.
+
+    ``install`` reads every cell once in a single script call; afterwards
+    ``refresh`` only transfers the cells the observer saw change.
+    ``selected`` holds the seats picked in this session; ``clicked`` those
+    clicked without a confirmed change yet, which are never clicked again
+    (a second click would deselect them) and join ``selected`` when the
+    observer sees them change.
+    """
+
+    def __init__(self, driver, container_xpath, cell_css, mode="text", available_class="available"):
+        self.driver = driver
+        self.container_xpath = container_xpath
+        self.cell_css = cell_css
+        self.mode = mode
+        self.available_class = available_class
+        self.seats = {}
+        self.order = []
+        self.selected = set()
+        self.clicked = set()
+        self.installed = False
+
+    def install(self):
+        """Snapshot the whole container and start observing it"""
+        snapshot = self.driver.execute_script(INSTALL_JS, self.container_xpath, self.cell_css, self.mode,
+                                              self.available_class)
+        self.load(snapshot or [])
+        self.installed = snapshot is not None
+        return self.installed
+
+    def lookup(self, names):
+        """Read and observe only the cells named in ``names``, without scanning the container.
+
+        Returns the keys of those that are available, in the order of
+        ``names``. ``install`` replaces this partial map with the full one.
+        """
+        self.load(self.driver.execute_script(LOOKUP_JS, self.cell_css, [str(name) for name in names],
+                                             self.mode, self.available_class) or [])
+        self.installed = False
+        return self.available()
+
+    def load(self, states):
+        self.seats = {}
+        self.order = []
+        for state in states:
+            self.seats[state["key"]] = state
+            self.order.append(state["key"])
+            if state["selected"] and state["key"] in self.clicked:
+                self.clicked.discard(state["key"])
+                self.selected.add(state["key"])
+
+    def refresh(self):
+        """Apply changed cells; reinstall only if the container was rebuilt"""
+        return self.apply_drained(self.driver.execute_script(DRAIN_JS))
+
+    def apply_drained(self, changes):
+        """Apply a ``DRAIN_JS`` result, e.g. one run together with other scripts"""
+        if changes is None:
+            self.install()
+            return list(self.order)
+        self.apply(changes)
+        return [state["key"] for state in changes]
+
+    def apply(self, changes):
+        """Store changed cell states; a clicked seat that changed was selected late"""
+        for state in changes:
+            key = state["key"]
+            self.seats[key] = state
+            if key in self.clicked:
+                self.clicked.discard(key)
+                if not state["taken"]:
+                    self.selected.add(key)
+
+    def available(self):
+        """Keys of available seats not selected or clicked yet, in table order"""
+        return [key for key in self.order
+                if self.seats[key]["available"] and key not in self.selected and key not in self.clicked]
+
+    def match(self, names):
+        """Keys of available, unselected seats whose cell goes by one of ``names``, in that order"""
+        keys_by_name = {}
+        for key in self.available():
+            for name in self.seats[key].get("names", []):
+                keys_by_name.setdefault(name, key)
+        keys = []
+        for name in names:
+            key = keys_by_name.get(str(name))
+            if key is not None and key not in keys:
+                keys.append(key)
+        return keys
+
+    def unavailable_count(self):
+        return sum(1 for state in self.seats.values() if not state["available"])
+
+    def click_batch(self, keys, timeout=1.5):
+        """Click seats in order inside the page and confirm each by its state change.
+
+        A seat whose class, text or aria state changed within ``timeout``
+        seconds of its click is selected. The others stay in ``clicked``
+        and the observer's changes are read once more after the batch, so
+        a late confirmation is not missed. Returns the newly selected keys.
+        """
+        before = set(self.selected)
+        results = self.driver.execute_async_script(CLICK_BATCH_JS, list(keys), int(timeout * 1000))
+        for result in results:
+            if result["confirmed"]:
+                self.selected.add(result["key"])
+            else:
+                self.clicked.add(result["key"])
+        if self.clicked:
+            self.refresh()
+        return [key for key in keys if key in self.selected and key not in before]
+
+    def element(self, key):
+        """WebElement for a seat key, or None if it is no longer on the page"""
+        return self.driver.execute_script(ELEMENT_JS, key)
@@ -0,0 +1,80 @@
+"""Local clock offset calibrated from HTTP Date headers of page loads"""
+
+import time
+from email.utils import parsedate_to_datetime
+
+
+class ServerClock:
+    """Estimate the site's clock from the Date header of document responses.
+
+    Each response bounds the offset: the server stamped Date (truncated to
+    whole seconds) after the request was sent and before the headers
+    arrived. Intersecting the bounds of several loads narrows the estimate.
+    """
+
+    def __init__(self, events):
+        self.requests = {}
+        self.low = None
+        self.high = None
+        self.samples = 0
+        self.rejected = 0
+        events.subscribe(self.on_event)
+
+    def on_event(self, method, params):
+        if method == "Network.requestWillBeSent" and params.get("type") == "Document":
+            # Map the browser's monotonic timestamps onto wall-clock time
+            self.requests[params["requestId"]] = params["wallTime"] - params["timestamp"]
+        elif method == "Network.responseReceived" and params.get("type") == "Document":
+            wall_base = self.requests.pop(params.get("requestId"), None)
+            response = params.get("response", {})
+            headers = {name.lower(): value for name, value in response.get("headers", {}).items()}
+            timing = response.get("timing")
+            if wall_base is None or not timing or "date" not in headers:
+                return
+            if response.get("fromDiskCache") or response.get("fromServiceWorker"):
+                # The Date header was stamped when the cached copy was fetched
+                return
+            try:
+                server_time = parsedate_to_datetime(headers["date"]).timestamp()
+            except (TypeError, ValueError):
+                return
+
+            sent = wall_base + timing["requestTime"] + timing["sendStart"] / 1000.0
+            received = wall_base + timing["requestTime"] + timing["receiveHeadersEnd"] / 1000.0
+            self.add_sample(server_time, sent, received)
+
+    def add_sample(self, server_time, sent, received):
+        """Narrow the offset range with one Date header observation"""
+        low = server_time - received
+        high = server_time + 1.0 - sent
+        if self.low is None:
+            self.low, self.high = low, high
+        elif max(self.low, low) > min(self.high, high):
+            # Disagrees with the accumulated range (stale proxy, clock step): drop it
+            self.rejected += 1
+            return
+        else:
+            self.low, self.high = max(self.low, low), min(self.high, high)
+        self.samples += 1
+
+    def offset(self):
+        """Seconds to add to local time to get server time (0 if unknown)"""
+        if self.low is None:
+            return 0.0
+        return (self.low + self.high) / 2
+
+    def uncertainty(self):
+        """Half-width of the offset range in seconds"""
+        if self.low is None:
+            return None
+        return (self.high - self.low) / 2
+
+    def wait_until(self, server_timestamp):
+        """Sleep until the given server time, spinning for the last moment"""
+        local_target = server_timestamp - self.offset()
+        while True:
+            remaining = local_target - time.time()
+            if remaining <= 0:
+                return
+            if remaining > 0.05:
+                time.sleep(min(remaining - 0.05, 1.0))
@@ -0,0 +1,161 @@
+"""Show rounds of an event page, read in one call and cached per event URL"""
+
+import re
+import time
+from .locators import LOCATE_JS
+
+# arguments: [by, value] locator of the show rows. Returns each row's text
+# lines and whether it looks disabled, in page order.
+EXTRACT_SHOWS_JS = LOCATE_JS + """
+var rows = locateAll(arguments[0][0], arguments[0][1]);
+return rows.map(function (row) {
+    var text = (row.innerText || row.textContent || '').replace(/\\u00a0/g, ' ');
+    var disabled = !!(row.disabled || row.getAttribute('aria-disabled') === 'true' ||
+        /(^|[\\s_-])(disabled|sold-?out|soldout)/i.test(row.getAttribute('class') || '') ||
+        row.querySelector('[disabled], .disabled, .sold-out, .soldout'));
+    return {
+        lines: text.split('\\n').map(function (line) { return line.trim(); })
+            .filter(function (line) { return line; }),
+        disabled: disabled
+    };
+});
+"""
+
+# arguments: [by, value] of the show rows, 1-based row index, expected row
+# label, [by, value] of the element to click. Clicks only when the row still
+# reads as the label; returns whether it clicked.
+CLICK_SHOW_JS = LOCATE_JS + """
+var row = locateAll(arguments[0][0], arguments[0][1])[arguments[1] - 1];
+if (!row) {
+    return false;
+}
+var label = (row.innerText || row.textContent || '').replace(/\\u00a0/g, ' ').split('\\n')
+    .map(function (line) { return line.trim(); })
+    .filter(function (line) { return line; }).join(' ');
+if (label !== arguments[2]) {
+    return false;
+}
+var target = locateAll(arguments[3][0], arguments[3][1])[0];
+if (!target) {
+    return false;
+}
+target.scrollIntoView({block: 'center'});
+target.click();
+return true;
+"""
+
+DATE_RE = re.compile(r"\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}/\d{2,4}|\d{1,2}\s+[^\s\d:]+\s+\d{4}")
+TIME_RE = re.compile(r"\b\d{1,2}[:.]\d{2}\b(?:\s*[AaPp]\.?[Mm]\.?)?")
+SOLD_OUT_RE = re.compile(r"sold\s*out|unavailable|closed|หมด|เต็ม|ปิด", re.IGNORECASE)
+
+
+def normalize(text):
+    """Lowercase, single-spaced, with 19.00 written as 19:00"""
+    text = re.sub(r"\b(\d{1,2})\.(\d{2})\b", r"\1:\2", text)
+    return " ".join(text.lower().split())
+
+
+def parse_row(lines, disabled):
+    """Date, time, venue and status from one row's text lines.
+
+    The venue is the first line that is neither the date, the time nor a
+    status or button label, so it is best-effort on layouts without one.
+    """
+    text = " ".join(lines)
+    date = DATE_RE.search(text)
+    show_time = TIME_RE.search(DATE_RE.sub(" ", text))
+    sold_out = disabled or bool(SOLD_OUT_RE.search(text))
+    venue = next((line for line in lines
+                  if not DATE_RE.search(line) and not TIME_RE.search(line)
+                  and not SOLD_OUT_RE.search(line) and len(line) > 3), None)
+    return {
+        "date": date.group(0) if date else None,
+        "time": normalize(show_time.group(0)) if show_time else None,
+        "venue": venue,
+        "status": "sold_out" if sold_out else "available",
+        "label": text
+    }
+
+
+class ShowCatalog:
+    """Every show round of an event, indexed by position, date and time.
+
+    Entries are dicts with ``index`` (1-based page order), ``date``,
+    ``time``, ``venue``, ``status``, ``label`` and the ``[by, value]``
+    ``locator`` that selects the round. ``cached`` is set when the
+    catalog came from the cache rather than the page.
+    """
+
+    def __init__(self, shows, cached=False):
+        self.shows = shows
+        self.cached = cached
+        self.by_date = {}
+        self.by_time = {}
+        for show in shows:
+            if show["date"]:
+                self.by_date.setdefault(normalize(show["date"]), []).append(show)
+            if show["time"]:
+                self.by_time.setdefault(show["time"], []).append(show)
+
+    @classmethod
+    def from_rows(cls, rows, locator):
+        """Build from ``EXTRACT_SHOWS_JS`` rows; ``locator(index)`` gives each round's locator"""
+        shows = []
+        for index, row in enumerate(rows or [], 1):
+            show = parse_row(row["lines"], row["disabled"])
+            show["index"] = index
+            show["locator"] = locator(index)
+            shows.append(show)
+        return cls(shows)
+
+    def find(self, choice):
+        """Show for a user choice: a position ("2"), a date, a time or words of its label.
+
+        Among several matches an available round wins over a sold-out one,
+        then the earliest. Returns None when nothing matches.
+        """
+        choice = str(choice).strip()
+        if choice.isdigit():
+            index = int(choice)
+            return self.shows[index - 1] if 0 < index <= len(self.shows) else None
+
+        wanted = normalize(choice)
+        matches = self.by_date.get(wanted) or self.by_time.get(wanted)
+        if not matches:
+            words = wanted.split()
+            matches = [show for show in self.shows
+                       if all(word in normalize(show["label"]) for word in words)]
+        if not matches:
+            return None
+        return min(matches, key=lambda show: (show["status"] != "available", show["index"]))
+
+    def labels(self):
+        return [show["label"] for show in self.shows]
+
+    def __len__(self):
+        return len(self.shows)
+
+
+class CatalogCache:
+    """Show catalogs per event URL, kept in memory for one run and its retries.
+
+    Nothing is written to disk: positions and statuses from another run may
+    no longer match the page. Entries older than ``ttl`` seconds are read
+    again, since rounds can be added or sell out.
+    """
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self.entries = {}
+
+    def get(self, url):
+        entry = self.entries.get(url)
+        if not entry or time.time() - entry["saved"] > self.ttl:
+            return None
+        return ShowCatalog(entry["shows"], cached=True)
+
+    def put(self, url, catalog):
+        self.entries[url] = {"saved": time.time(), "shows": catalog.shows}
+
+    def clear(self):
+        self.entries.clear()
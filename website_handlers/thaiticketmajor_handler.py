@@ -1,36 +1,54 @@
 """Handler for Thai Ticket Major website"""
 
+import logging
 from selenium.webdriver.common.by import By
 from .base_handler import BaseTicketHandler
-from time import sleep
+from .network_capture import is_available
+
+
+logger = logging.getLogger(__name__)
+
+# [zone name, seats available] for every row of the availability popup,
+# header row excluded
+POPUP_ROWS_JS = """
+var rows = document.querySelectorAll('.container-popup > table:first-of-type > tbody:first-of-type > tr');
+return Array.prototype.slice.call(rows, 1).map(function (row) {
+    return [0, 1].map(function (column) {
+        var cell = row.cells[column];
+        return cell ? cell.innerText.trim() : '';
+    });
+});
+"""
+
+# Pick the rdId dropdown option for a round: the one showing its date and
+# time, else its time, else the same position. Fires change like a user pick.
+SELECT_ROUND_JS = """
+var select = document.getElementById('rdId');
+var date = (arguments[0] || '').toLowerCase();
+var time = arguments[1] || '';
+var options = Array.prototype.slice.call(select.options, 1);
+function text(option) {
+    return option.text.toLowerCase().replace(/(\\d{1,2})\\.(\\d{2})/g, '$1:$2');
+}
+var option = options.filter(function (o) {
+    return date && time && text(o).indexOf(date) !== -1 && text(o).indexOf(time) !== -1;
+})[0] || options.filter(function (o) {
+    return time && text(o).indexOf(time) !== -1;
+})[0] || options[arguments[2] - 1];
+if (!option) {
+    return null;
+}
+select.value = option.value;
+select.dispatchEvent(new Event('change', {bubbles: true}));
+return option.text.trim();
+"""
 
 
 class ThaiTicketMajorHandler(BaseTicketHandler):
-    def __init__(self, driver, config, user_details):
-        super().__init__(driver, config, user_details)
+    def __init__(self, driver, config, user_details, backend="selenium"):
+        super().__init__(driver, config, user_details, backend)
         self.seat_count = 0
         
-    def login(self):
-        """Login to Thai Ticket Major"""
-        login_selectors = self.config["login_selectors"]
-        
-        # Click login button
-        self.click_element_safe(By.XPATH, login_selectors["login_button"])
-        sleep(1)
-        
-        # Enter credentials
-        username = self.find_element_safe(By.ID, login_selectors["username_field"])
-        if username:
-            username.send_keys(self.user_details["email"])
-            
-        password = self.find_element_safe(By.ID, login_selectors["password_field"])
-        if password:
-            password.send_keys(self.user_details["pwd"])
-            
-        # Submit login
-        self.click_element_safe(By.XPATH, login_selectors["submit_button"])
-        sleep(2)
-        
     def search_concert(self):
         """Search for concert"""
         current_url = self.driver.current_url
@@ -40,36 +58,35 @@ class ThaiTicketMajorHandler(BaseTicketHandler):
             try:
                 concert_link = self.driver.find_element(By.PARTIAL_LINK_TEXT, concert_name)
                 concert_link.click()
-                self.driver.implicitly_wait(30)
+                if self.wait_for_url_change(current_url, timeout=5):
+                    self.wait_for_stage("event")
             except:
-                print(f"Concert '{concert_name}' not found")
+                logger.warning(f"Concert '{concert_name}' not found")
                 break
                 
-    def select_show(self):
+    def select_show(self, show=None):
         """Select show round"""
-        show_num = int(self.user_details["show"])
-        booking_selectors = self.config["booking_selectors"]
+        entry = self.click_show(show)
+        if entry is None:
+            return False
         
-        # Get number of available shows
-        shows = self.driver.find_elements(By.XPATH, "//div[@class='box-event-list']/div[2]/div")
-        
-        if show_num <= len(shows):
-            show_selector = booking_selectors["show_selector"].format(show=show_num)
-            self.click_element_safe(By.XPATH, show_selector)
-            self.driver.implicitly_wait(30)
-            
-            # Check if show is selected
-            selected = self.find_element_safe(By.XPATH, "//*[@id='rdId']/option[1]")
-            if selected and "เลือกรอบการแสดง" in selected.text:
-                self.click_element_safe(By.ID, "rdId")
-                self.driver.implicitly_wait(30)
-                self.click_element_safe(By.XPATH, f"//*[@div='select-date fix-me']/option[{show_num+1}]")
-                self.driver.implicitly_wait(30)
+        # Some events ask for the round again in the rdId dropdown
+        booking_selectors = self.config["booking_selectors"]
+        index, _ = self.find_first_of([
+            ("xpath", booking_selectors["zone_map"]),
+            ("xpath", "//*[@id='rdId']/option[1][contains(., 'เลือกรอบการแสดง')]")
+        ])
+        if index == 1:
+            chosen = self.driver.execute_script(SELECT_ROUND_JS, entry["date"], entry["time"], entry["index"])
+            logger.info(f"Picked round {chosen!r} from the dropdown")
+            self.wait_for_stage("zone")
+        return True
                 
     def select_zone(self, zone=None):
         """Select seating zone"""
         if zone is None:
             zone = self.user_details["zone"]
+        self.enter_zone(zone)
             
         booking_selectors = self.config["booking_selectors"]
         zone_areas = self.driver.find_elements(By.XPATH, booking_selectors["zone_map"])
@@ -81,37 +98,22 @@ class ThaiTicketMajorHandler(BaseTicketHandler):
             if href and zone in href.split('#'):
                 while self.driver.current_url == current_url:
                     area.click()
-                    self.driver.implicitly_wait(30)
+                    if self.wait_for_url_change(current_url, timeout=5):
+                        self.wait_for_stage("seats")
                 break
                 
     def select_seats(self):
         """Select available seats"""
         seats_needed = int(self.user_details["seats"])
-        self.seat_count = 0
-        
-        # Find seat table
-        rows = self.driver.find_elements(By.XPATH, "//*[@id='tableseats']/tbody[1]/tr")
         
-        for i in range(1, len(rows) + 1):
-            columns = self.driver.find_elements(By.XPATH, f"//*[@id='tableseats']/tbody[1]/tr[{i}]/td")
-            
-            for j in range(2, len(columns) + 1):
-                seat_element = self.driver.find_element(By.XPATH, f"//*[@id='tableseats']/tbody[1]/tr[{i}]/td[{j}]")
-                seat_text = seat_element.text
-                seat_title = seat_element.get_attribute("title")
-                
-                if seat_text == " ":
-                    print(f"Seat {seat_title} not available")
-                elif seat_text != " " and seat_text != "" and self.seat_count < seats_needed:
-                    seat_element.click()
-                    self.seat_count += 1
-                    print(f"Selected seat: {seat_title}")
-                    
-                if self.seat_count == seats_needed:
-                    break
-                    
-            if self.seat_count == seats_needed:
-                break
+        # Prefer seats the page's own seat data lists, looked up by name;
+        # only read the whole table, once, if more are needed
+        seat_map = self.start_seat_map()
+        self.select_captured_seats(seats_needed - len(seat_map.selected))
+        if len(seat_map.selected) < seats_needed:
+            self.load_seat_map()
+            self.select_seats_from_map(seats_needed - len(seat_map.selected))
+        self.seat_count = self.finish_seat_selection()
                 
         return self.seat_count > 0
         
@@ -128,29 +130,37 @@ class ThaiTicketMajorHandler(BaseTicketHandler):
             self.driver.find_element(By.PARTIAL_LINK_TEXT, "Continue").click()
             self.driver.implicitly_wait(40)
             
-            print("Booking confirmed successfully!")
+            logger.info("Booking confirmed successfully!")
             return True
         return False
         
+    def read_zone_availability(self):
+        """Open the seats-available popup and read every row in one call"""
+        self.driver.find_element(By.PARTIAL_LINK_TEXT, "ที่นั่งว่าง / Seats Available").click()
+        self.driver.implicitly_wait(30)
+        return dict(self.driver.execute_script(POPUP_ROWS_JS))
+        
     def find_alternative_zones(self):
         """Find alternative zones if preferred zone is not available"""
         # Go back to zone selection
         self.driver.find_element(By.PARTIAL_LINK_TEXT, "ย้อนกลับ / Back").click()
         self.driver.implicitly_wait(40)
         
-        # Check available zones
-        self.driver.find_element(By.PARTIAL_LINK_TEXT, "ที่นั่งว่าง / Seats Available").click()
-        self.driver.implicitly_wait(30)
+        # Zone availability the page already fetched, if captured
+        zones = self.captured_zones()
+        if zones:
+            for zone_name, availability in zones.items():
+                if zone_name != self.user_details["zone"] and is_available(availability):
+                    logger.info(f"Trying alternative zone: {zone_name}")
+                    self.select_zone(zone_name)
+                    if self.select_seats():
+                        return True
+            return False
         
-        # Get zone availability
-        zone_rows = self.driver.find_elements(By.XPATH, "//*[@class='container-popup']/table[1]/tbody[1]/tr")
-        
-        for i in range(2, len(zone_rows) + 1):
-            zone_name = self.driver.find_element(By.XPATH, f"//*[@class='container-popup']/table[1]/tbody[1]/tr[{i}]/td[1]").text
-            availability = self.driver.find_element(By.XPATH, f"//*[@class='container-popup']/table[1]/tbody[1]/tr[{i}]/td[2]").text
-            
+        # Check available zones
+        for zone_name, availability in self.read_zone_availability().items():
             if availability != "0" and availability != "":
-                print(f"Trying alternative zone: {zone_name}")
+                logger.info(f"Trying alternative zone: {zone_name}")
                 self.select_zone(zone_name)
                 if self.select_seats():
                     return True
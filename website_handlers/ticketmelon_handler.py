@@ -1,69 +1,49 @@
 """Handler for Ticket Melon website"""
 
+import logging
 from selenium.webdriver.common.by import By
 from .base_handler import BaseTicketHandler
 from time import sleep
 
 
+logger = logging.getLogger(__name__)
+
+
 class TicketMelonHandler(BaseTicketHandler):
-    def __init__(self, driver, config, user_details):
-        super().__init__(driver, config, user_details)
+    def __init__(self, driver, config, user_details, backend="selenium"):
+        super().__init__(driver, config, user_details, backend)
         self.seat_count = 0
         
-    def login(self):
-        """Login to Ticket Melon"""
-        login_selectors = self.config["login_selectors"]
-        
-        # Click login button
-        self.click_element_safe(By.XPATH, login_selectors["login_button"])
-        sleep(1)
-        
-        # Enter credentials
-        username = self.find_element_safe(By.NAME, login_selectors["username_field"])
-        if username:
-            username.send_keys(self.user_details["email"])
-            
-        password = self.find_element_safe(By.NAME, login_selectors["password_field"])
-        if password:
-            password.send_keys(self.user_details["pwd"])
-            
-        # Submit login
-        self.click_element_safe(By.XPATH, login_selectors["submit_button"])
-        sleep(2)
-        
     def search_concert(self):
         """Search for concert on Ticket Melon"""
         concert_name = self.user_details["concert"]
         
-        # Use search functionality or browse events
-        search_box = self.find_element_safe(By.NAME, "search")
-        if search_box:
-            search_box.send_keys(concert_name)
-            search_box.submit()
+        # Use search functionality or browse events, whichever the page offers
+        branch, element = self.find_first_of([
+            (By.NAME, "search"),
+            (By.PARTIAL_LINK_TEXT, concert_name)
+        ])
+        if branch == 0:
+            element.send_keys(concert_name)
+            element.submit()
+        elif branch == 1:
+            element.click()
         else:
-            # Browse for concert link
-            try:
-                concert_link = self.driver.find_element(By.PARTIAL_LINK_TEXT, concert_name)
-                concert_link.click()
-            except:
-                print(f"Concert '{concert_name}' not found on Ticket Melon")
+            logger.warning(f"Concert '{concert_name}' not found on Ticket Melon")
                 
-    def select_show(self):
+    def select_show(self, show=None):
         """Select show on Ticket Melon"""
-        show_num = int(self.user_details["show"])
-        booking_selectors = self.config["booking_selectors"]
-        
-        # Find available show times
-        shows = self.driver.find_elements(By.XPATH, booking_selectors["show_selector"])
-        
-        if show_num <= len(shows) and show_num > 0:
-            shows[show_num - 1].click()
-            sleep(2)
+        entry = self.click_show(show)
+        if entry is None:
+            return False
+        self.wait_for_stage("zone")
+        return True
             
     def select_zone(self, zone=None):
         """Select zone on Ticket Melon"""
         if zone is None:
             zone = self.user_details["zone"]
+        self.enter_zone(zone)
             
         booking_selectors = self.config["booking_selectors"]
         
@@ -79,21 +59,15 @@ class TicketMelonHandler(BaseTicketHandler):
     def select_seats(self):
         """Select seats on Ticket Melon"""
         seats_needed = int(self.user_details["seats"])
-        self.seat_count = 0
         
-        booking_selectors = self.config["booking_selectors"]
-        
-        # Find available seats
-        seats = self.driver.find_elements(By.XPATH, booking_selectors["seat_selector"])
-        
-        for seat in seats:
-            if "available" in seat.get_attribute("class").lower() and self.seat_count < seats_needed:
-                seat.click()
-                self.seat_count += 1
-                sleep(0.5)
-                
-                if self.seat_count == seats_needed:
-                    break
+        # Prefer seats the page's own seat data lists, looked up by name;
+        # only read the whole grid, once, if more are needed
+        seat_map = self.start_seat_map()
+        self.select_captured_seats(seats_needed - len(seat_map.selected))
+        if len(seat_map.selected) < seats_needed:
+            self.load_seat_map()
+            self.select_seats_batch(seats_needed - len(seat_map.selected))
+        self.seat_count = self.finish_seat_selection()
                     
         return self.seat_count > 0
         
@@ -102,10 +76,13 @@ class TicketMelonHandler(BaseTicketHandler):
         if self.seat_count > 0:
             booking_selectors = self.config["booking_selectors"]
             
-            # Click confirm button
-            self.click_element_safe(By.XPATH, booking_selectors["confirm_button"])
+            # Click confirm button; no wait when seat selection already saw it
+            if self.confirm_ready:
+                self.driver.find_element(By.XPATH, booking_selectors["confirm_button"]).click()
+            else:
+                self.click_element_safe(By.XPATH, booking_selectors["confirm_button"])
             sleep(3)
             
-            print("Ticket Melon booking confirmed!")
+            logger.info("Ticket Melon booking confirmed!")
             return True
         return False
\ No newline at end of file